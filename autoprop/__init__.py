@@ -14,11 +14,13 @@ The :mod:`autoprop` module can be directly used as a class decorator.
 """
 
 from .decorators import (
-        autoprop, cache, dynamic, immutable, policy, ignore
+        autoprop, cache, dynamic, immutable, policy, ignore, invalidates,
+        Autoprop,
 )
 from .cache import (
         get_cache, clear_cache,
         get_cached_attr, set_cached_attr, del_cached_attr,
+        Storage, DictStorage, SlotStorage, WeakStorage, CachedAwaitable,
 )
 
 __version__ = '4.1.0'
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for the overhead introduced by :mod:`autoprop`.
+
+Each suite lives in its own submodule and can be run from the command line::
+
+    $ python -m autoprop.bench latency
+
+Run ``python -m autoprop.bench --help`` to see all of the available suites.
+The results are printed as a table and, if requested, written to a JSON file
+that can later be used as a baseline for detecting regressions.
+"""
+
+import gc
+import json
+import sys
+
+from pathlib import Path
+from time import perf_counter
+
+BASELINE_DIR = Path(__file__).parent / 'baselines'
+
+def time_batches(make_batch, run, *, repeat=5):
+    """
+    Return the best per-item time (in seconds) for the given operation.
+
+    Arguments:
+        make_batch:
+            A callable that returns a fresh list of items to operate on.  This
+            is called once before each repeat, and is not timed.
+
+        run:
+            A callable that applies the operation being timed to every item in
+            the batch.
+
+        repeat:
+            How many times to repeat the measurement.  The fastest repeat is
+            reported, because slower repeats are almost always caused by
+            interference from other processes.
+
+    The cost of iterating over the batch is measured separately and subtracted
+    from the result, so only the cost of the operation itself is reported.
+    Garbage collection is disabled while timing, as in :mod:`timeit`.
+    """
+    t_op = _best_time(make_batch, run, repeat)
+    t_loop = _best_time(make_batch, _run_empty, repeat)
+    return max(t_op - t_loop, 0)
+
+def compare_to_baseline(results, baseline, *, tolerance):
+    """
+    Return a list of the results that are slower than the given baseline.
+
+    Arguments:
+        results:
+            A nested dictionary of normalized results, as produced by any of
+            the benchmark suites.
+
+        baseline:
+            A nested dictionary with the same structure as *results*.
+
+        tolerance:
+            How much slower than the baseline a result can be before it is
+            considered a regression, as a fraction of the baseline (e.g. 0.5
+            means 50% slower).
+
+    Each regression is reported as a ``(key, result, baseline)`` tuple, where
+    *key* is a tuple of the keys needed to find the result in the nested
+    dictionary.  Results that are missing from either dictionary are ignored.
+    """
+    regressions = []
+
+    def recurse(key, result, expected):
+        if isinstance(result, dict):
+            for k in result:
+                if isinstance(expected, dict) and k in expected:
+                    recurse((*key, k), result[k], expected[k])
+
+        elif result is not None and expected is not None:
+            if result > expected * (1 + tolerance):
+                regressions.append((key, result, expected))
+
+    recurse((), results, baseline)
+    return regressions
+
+def load_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+def dump_json(data, path):
+    if str(path) == '-':
+        json.dump(data, sys.stdout, indent=2)
+        print()
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
+def format_table(rows, header):
+    """
+    Format the given rows as a plain-text table with right-aligned columns.
+    """
+    rows = [[_format_cell(x) for x in row] for row in rows]
+    widths = [
+            max(len(str(x)) for x in col)
+            for col in zip(header, *rows)
+    ]
+    lines = [
+            '  '.join(f'{x:>{w}}' for x, w in zip(header, widths)),
+            '  '.join('-' * w for w in widths),
+            *('  '.join(f'{x:>{w}}' for x, w in zip(row, widths)) for row in rows),
+    ]
+    return '\n'.join(lines)
+
+def _format_cell(x):
+    if x is None:
+        return '-'
+    if isinstance(x, float):
+        return f'{x:.1f}'
+    return str(x)
+
+def _best_time(make_batch, run, repeat):
+    best = None
+
+    for i in range(repeat):
+        batch = make_batch()
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            t0 = perf_counter(); run(batch); t1 = perf_counter()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        t = (t1 - t0) / len(batch)
+        best = t if best is None else min(best, t)
+
+    return best
+
+def _run_empty(batch):
+    for x in batch:
+        pass
+
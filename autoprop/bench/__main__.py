@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+import autoprop.bench
+
+from importlib import import_module
+
+SUITES = {
+        'latency': "Time property accesses for each cache policy.",
+        'memory': "Measure the memory used by each cache policy.",
+        'decoration': "Time class decoration and module import.",
+        'threads': "Measure how cached properties behave under threads.",
+        'stress': "Measure throughput while many threads share cached properties.",
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+            prog='python -m autoprop.bench',
+            description=autoprop.bench.__doc__,
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest='suite', metavar='<suite>')
+    subparsers.required = True
+
+    for name, help in SUITES.items():
+        suite = import_module(f'autoprop.bench.{name}')
+        subparser = subparsers.add_parser(
+                name,
+                help=help,
+                description=suite.__doc__,
+                formatter_class=argparse.RawDescriptionHelpFormatter,
+        )
+        suite.add_arguments(subparser)
+        subparser.set_defaults(run=suite.run)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
+
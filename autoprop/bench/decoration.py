@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+
+"""
+Measure how long it takes to decorate classes, and to import modules full of
+decorated classes.
+
+This benchmark generates synthetic modules for several kinds of class
+hierarchies:
+
+- ``wide``: Independent classes, each with many accessors.
+- ``deep``: Long inheritance chains, where each class adds a few accessors
+  and overrides one of its parent's accessors.
+- ``noisy``: Independent classes with a few accessors and many methods that
+  are not accessors.
+
+Two measurements are made for each kind of hierarchy:
+
+- ``decorate``: The time it takes to apply the decorator to every class in
+  the module, not including the time it takes to create the classes.
+  Measured in-process.
+- ``import``: The extra time it takes to import the module when the classes
+  are decorated, compared to when they aren't.  Measured using ``python -X
+  importtime`` in a separate process, so that nothing is cached from previous
+  imports.
+
+Times are reported in milliseconds.  Decoration times are also reported
+relative to the time it takes to create the (undecorated) classes in the
+first place, and these relative times are what gets compared against the
+baseline.
+"""
+
+import autoprop
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+
+from . import (
+        compare_to_baseline, load_json, dump_json, format_table, BASELINE_DIR,
+)
+from pathlib import Path
+from time import perf_counter
+
+DEFAULT_BASELINE = BASELINE_DIR / 'decoration.json'
+
+def make_wide_source(num_classes, *, num_props=20):
+    lines = []
+
+    for i in range(num_classes):
+        lines += [
+                f"@DECORATE",
+                f"class Wide{i}:",
+        ]
+        for j in range(num_props):
+            lines += _make_accessors(f'p{j}')
+        lines += [""]
+
+    return '\n'.join(lines)
+
+def make_deep_source(num_classes, *, depth=10, num_props=2):
+    lines = []
+
+    for i in range(num_classes // depth):
+        for j in range(depth):
+            parent = f"(Deep{i}_{j-1})" if j else ""
+            lines += [
+                    f"@DECORATE",
+                    f"class Deep{i}_{j}{parent}:",
+            ]
+            for k in range(num_props):
+                lines += _make_accessors(f'p{j}_{k}')
+
+            # Override one of the parent's getters, so that the decorator has
+            # to look up the rest of the parent's accessors.
+            if j:
+                lines += [
+                        f"    def get_p{j-1}_0(self):",
+                        f"        return {j}",
+                ]
+            lines += [""]
+
+    return '\n'.join(lines)
+
+def make_noisy_source(num_classes, *, num_props=2, num_methods=40):
+    lines = []
+
+    for i in range(num_classes):
+        lines += [
+                f"@DECORATE",
+                f"class Noisy{i}:",
+        ]
+        for j in range(num_props):
+            lines += _make_accessors(f'p{j}')
+        for j in range(num_methods):
+            lines += [
+                    f"    def method{j}(self, a, b=None):",
+                    f"        return a",
+                    f"    def getter{j}(self, i):",
+                    f"        return i",
+            ]
+        lines += [""]
+
+    return '\n'.join(lines)
+
+HIERARCHIES = {
+        'wide': make_wide_source,
+        'deep': make_deep_source,
+        'noisy': make_noisy_source,
+}
+
+DECORATORS = {
+        'autoprop': 'autoprop',
+        'manual': "autoprop.cache(policy='manual')",
+        'lazy': "autoprop(lazy=True)",
+}
+
+def measure_decoration(source, decorator, *, repeat=5):
+    """
+    Return the best time (in seconds) taken to create the classes defined in
+    the given source code, and the best time taken to decorate them.
+    """
+    code = compile(source, '<autoprop.bench>', 'exec')
+    decorator = eval(decorator, {'autoprop': autoprop})
+    t_create = t_decorate = None
+
+    for i in range(repeat):
+        scope = {'DECORATE': lambda cls: cls}
+
+        t0 = perf_counter()
+        exec(code, scope)
+        t1 = perf_counter()
+
+        classes = [x for x in scope.values() if isinstance(x, type)]
+
+        t2 = perf_counter()
+        for cls in classes:
+            decorator(cls)
+        t3 = perf_counter()
+
+        t_create = _min(t_create, t1 - t0)
+        t_decorate = _min(t_decorate, t3 - t2)
+
+    return t_create, t_decorate
+
+def measure_import(source, decorator, *, repeat=5):
+    """
+    Return the best extra time (in seconds) that it takes to import a module
+    with the given source code when the classes it defines are decorated.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        header = "import autoprop\n"
+
+        (tmp / 'bench_decorated.py').write_text(
+                f"{header}DECORATE = {decorator}\n{source}"
+        )
+        (tmp / 'bench_undecorated.py').write_text(
+                f"{header}DECORATE = lambda cls: cls\n{source}"
+        )
+
+        # Import each module once without timing it, so that the cost of
+        # compiling the source code isn't included in the measurement.
+        for name in ['bench_decorated', 'bench_undecorated']:
+            _import_time(tmp, name)
+
+        t_decorated = t_undecorated = None
+
+        for i in range(repeat):
+            t_decorated = _min(
+                    t_decorated, _import_time(tmp, 'bench_decorated'))
+            t_undecorated = _min(
+                    t_undecorated, _import_time(tmp, 'bench_undecorated'))
+
+    return max(t_decorated - t_undecorated, 0)
+
+def measure_autoprop_import(*, repeat=5):
+    """
+    Return the best time (in seconds) that it takes to import autoprop itself.
+    """
+    t = None
+
+    for i in range(repeat):
+        t = _min(t, _import_time(None, 'autoprop'))
+
+    return t
+
+def add_arguments(parser):
+    parser.add_argument(
+            '-n', '--classes', type=int, default=200,
+            help="The number of classes to define in each module.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-r', '--repeat', type=int, default=3,
+            help="The number of times to repeat each measurement.",
+    )
+    parser.add_argument(
+            '-H', '--hierarchy', action='append', choices=list(HIERARCHIES),
+            help="Only benchmark the given kind of class hierarchy.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-d', '--decorator', action='append', choices=list(DECORATORS),
+            help="Only benchmark the given decorator.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-I', '--no-import', dest='import_', action='store_false',
+            help="Don't measure import times.",
+    )
+    parser.add_argument(
+            '-o', '--output',
+            help="Write the results to the given JSON file ('-' for stdout).",
+    )
+    parser.add_argument(
+            '-b', '--baseline', default=DEFAULT_BASELINE,
+            help="Compare the results to the given JSON file.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-B', '--no-baseline', dest='baseline', action='store_const', const=None,
+            help="Don't compare the results to any baseline.",
+    )
+    parser.add_argument(
+            '-t', '--tolerance', type=float, default=0.5,
+            help="How much slower than the baseline (as a fraction) a result can be before it's considered a regression.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '--save-baseline', action='store_true',
+            help="Overwrite the baseline with the new results, rather than comparing to it.",
+    )
+
+def run(args):
+    times = {}
+    relative = {}
+    rows = []
+
+    for hierarchy in args.hierarchy or HIERARCHIES:
+        source = HIERARCHIES[hierarchy](args.classes)
+
+        for decorator in args.decorator or DECORATORS:
+            decorator_src = DECORATORS[decorator]
+            t_create, t_decorate = measure_decoration(
+                    source, decorator_src,
+                    repeat=args.repeat,
+            )
+            t_import = measure_import(
+                    source, decorator_src,
+                    repeat=args.repeat,
+            ) if args.import_ else None
+
+            key = f'{hierarchy}/{decorator}'
+            times[key] = {
+                    'create': _ms(t_create),
+                    'decorate': _ms(t_decorate),
+                    'import': _ms(t_import),
+            }
+            relative[key] = {
+                    'decorate': t_decorate / t_create,
+            }
+            rows.append([
+                    key, *times[key].values(), relative[key]['decorate'],
+            ])
+
+    results = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'unit': 'ms',
+            'classes': args.classes,
+            'times': times,
+            'relative': relative,
+    }
+    if args.import_:
+        results['autoprop_import'] = _ms(measure_autoprop_import(repeat=args.repeat))
+
+    print(format_table(
+        rows,
+        header=['ms', 'create', 'decorate', 'import', 'decorate ÷ create'],
+    ))
+    if args.import_:
+        print()
+        print(f"import autoprop: {results['autoprop_import']:.1f} ms")
+
+    if args.output:
+        dump_json(results, args.output)
+
+    if args.save_baseline:
+        dump_json(results, args.baseline)
+        return 0
+
+    if not args.baseline:
+        return 0
+
+    baseline = load_json(args.baseline)
+    regressions = compare_to_baseline(
+            relative, baseline['relative'],
+            tolerance=args.tolerance,
+    )
+
+    print()
+    if not regressions:
+        print(f"No regressions relative to: {args.baseline}")
+        return 0
+
+    print(f"Regressions relative to: {args.baseline}")
+    for (key, _), result, expected in regressions:
+        print(f"  {key}: {result:.2f} (baseline: {expected:.2f})")
+    return 1
+
+def _make_accessors(name):
+    return [
+            f"    def get_{name}(self):",
+            f"        return self._{name}",
+            f"    def set_{name}(self, value):",
+            f"        self._{name} = value",
+    ]
+
+def _import_time(path, module):
+    """
+    Return the cumulative time (in seconds) that it takes to import the given
+    module in a new interpreter, as reported by ``python -X importtime``.
+    """
+    env = os.environ.copy()
+    pythonpath = [str(Path(autoprop.__file__).parent.parent)]
+    if path:
+        pythonpath.insert(0, str(path))
+    if env.get('PYTHONPATH'):
+        pythonpath.append(env['PYTHONPATH'])
+    env['PYTHONPATH'] = os.pathsep.join(pythonpath)
+
+    p = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+    )
+
+    for line in p.stderr.splitlines():
+        m = re.match(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s?(\s*)(\S+)$', line)
+        if m and not m.group(3) and m.group(4) == module:
+            return int(m.group(2)) / 1e6
+
+    raise RuntimeError(f"couldn't find import time for {module!r}:\n{p.stderr}")
+
+def _min(a, b):
+    return b if a is None else min(a, b)
+
+def _ms(t):
+    return t * 1e3 if t is not None else None
+
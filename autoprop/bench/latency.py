@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+"""
+Measure how long it takes to access properties made by each cache policy.
+
+The following operations are timed for each kind of property:
+
+- ``hit``: Get the value of a property that has already been accessed.
+- ``miss``: Get the value of a property that has never been accessed.
+- ``set``: Set the value of the property.
+- ``delete``: Delete the value of the property.
+- ``clear``: Call :func:`autoprop.clear_cache` on an object whose property has
+  already been accessed.
+- ``getter``: Call the ``get_x()`` method of an object whose property has
+  already been accessed.
+
+Plain ``@property`` and ``@functools.cached_property`` are included for
+reference.  Operations that don't make sense for a particular kind of property
+(e.g. setting an immutable property) are skipped.
+
+All times are also reported relative to the time it takes to get a plain
+``@property``.  These relative times are much less dependent on the speed of
+the machine running the benchmarks, so they are what gets compared against the
+baseline.
+"""
+
+import autoprop
+import platform
+import sys
+
+from . import (
+        time_batches, compare_to_baseline, load_json, dump_json, format_table,
+        BASELINE_DIR,
+)
+
+# `functools.cached_property` was added in Python 3.8.
+if sys.version_info >= (3, 8):
+    from functools import cached_property
+else:
+    from backports.cached_property import cached_property
+
+DEFAULT_BASELINE = BASELINE_DIR / 'latency.json'
+REFERENCE = 'property', 'hit'
+OPERATIONS = 'hit', 'miss', 'set', 'delete', 'clear', 'getter'
+REUSED_OBJECTS = 100
+REUSED_LOOPS = 10
+
+def make_property():
+
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+
+        @property
+        def x(self):
+            return self._x
+
+        @x.setter
+        def x(self, x):
+            self._x = x
+
+        @x.deleter
+        def x(self):
+            pass
+
+    return Obj
+
+def make_cached_property():
+
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+
+        @cached_property
+        def x(self):
+            return self._x
+
+    return Obj
+
+def make_autoprop(decorator):
+
+    @decorator
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+
+        def get_x(self):
+            return self._x
+
+    return Obj
+
+def make_dynamic():
+
+    @autoprop.dynamic
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+
+        def get_x(self):
+            return self._x
+
+        def set_x(self, x):
+            self._x = x
+
+        def del_x(self):
+            pass
+
+    return Obj
+
+SUBJECTS = {
+        'property': (
+            make_property,
+            {'hit', 'miss', 'set', 'delete'},
+        ),
+        'cached_property': (
+            make_cached_property,
+            {'hit', 'miss', 'set', 'delete'},
+        ),
+        'dynamic': (
+            make_dynamic,
+            {'hit', 'miss', 'set', 'delete', 'getter'},
+        ),
+        'overwrite': (
+            lambda: make_autoprop(autoprop.cache(policy='overwrite')),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+        'manual': (
+            lambda: make_autoprop(autoprop.cache(
+                policy='manual',
+                provide_mutators=True,
+            )),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+        'automatic': (
+            lambda: make_autoprop(autoprop.cache(
+                policy='automatic',
+                watch=['_x'],
+                provide_mutators=True,
+            )),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+        'automatic, versioned': (
+            lambda: make_autoprop(autoprop.cache(
+                policy='automatic',
+                watch=['_x'],
+                versioned=True,
+                provide_mutators=True,
+            )),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+        'tracked': (
+            lambda: make_autoprop(autoprop.cache(
+                policy='tracked',
+                provide_mutators=True,
+            )),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+        'immutable': (
+            lambda: make_autoprop(autoprop.immutable),
+            {'hit', 'miss', 'clear', 'getter'},
+        ),
+        'slots': (
+            lambda: make_autoprop(autoprop.cache(
+                policy='manual',
+                provide_mutators=True,
+                slots=True,
+            )),
+            {'hit', 'miss', 'set', 'delete', 'clear', 'getter'},
+        ),
+}
+
+def run_hit(batch):
+    for obj in batch:
+        obj.x
+
+def run_set(batch):
+    for obj in batch:
+        obj.x = 1
+
+def run_delete(batch):
+    for obj in batch:
+        del obj.x
+
+def run_clear(batch, clear_cache=autoprop.clear_cache):
+    for obj in batch:
+        clear_cache(obj)
+
+def run_getter(batch):
+    for obj in batch:
+        obj.get_x()
+
+def measure(subjects=None, *, batch_size=10000, repeat=7):
+    """
+    Time every supported operation for each of the given subjects.
+
+    Returns a dictionary mapping subject names to dictionaries that map
+    operation names to times in nanoseconds.  Unsupported operations are
+    mapped to None.
+    """
+    times = {}
+
+    # Discard the first measurement.  It's usually much slower than the rest, 
+    # presumably because the CPU hasn't ramped up to its full speed yet.
+    _measure_subject(REFERENCE[0], {REFERENCE[1]}, batch_size, repeat)
+
+    for name in subjects or SUBJECTS:
+        ops = SUBJECTS[name][1]
+        times[name] = _measure_subject(name, ops, batch_size, repeat)
+
+    # Everything is normalized by the reference time, so measure it once more 
+    # to reduce the impact of any one noisy measurement.
+    subject, op = REFERENCE
+    if subject in times:
+        t_ref = _measure_subject(subject, {op}, batch_size, repeat)[op]
+        times[subject][op] = min(times[subject][op], t_ref)
+
+    return times
+
+def normalize(times, reference=REFERENCE):
+    """
+    Express each time as a multiple of the reference time.
+    """
+    subject, op = reference
+    t_ref = times[subject][op]
+
+    return {
+            name: {
+                op: t / t_ref if t is not None else None
+                for op, t in ops.items()
+            }
+            for name, ops in times.items()
+    }
+
+def overhead(times):
+    """
+    Compare the cost of a cache hit for each policy to the ``overwrite``
+    policy.
+
+    These are the numbers quoted in the documentation for each policy.
+    """
+    if 'overwrite' not in times:
+        return {}
+
+    t_ref = times['overwrite']['hit']
+    return {
+            name: times[name]['hit'] / t_ref
+            for name in ('manual', 'automatic', 'automatic, versioned', 'tracked', 'immutable')
+            if name in times
+    }
+
+def add_arguments(parser):
+    parser.add_argument(
+            '-n', '--batch-size', type=int, default=10000,
+            help="The number of objects to operate on in each repeat.",
+    )
+    parser.add_argument(
+            '-r', '--repeat', type=int, default=7,
+            help="The number of times to repeat each measurement.",
+    )
+    parser.add_argument(
+            '-s', '--subject', action='append', choices=list(SUBJECTS),
+            help="Only benchmark the given kind of property.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-o', '--output',
+            help="Write the results to the given JSON file ('-' for stdout).",
+    )
+    parser.add_argument(
+            '-b', '--baseline', default=DEFAULT_BASELINE,
+            help="Compare the results to the given JSON file.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-B', '--no-baseline', dest='baseline', action='store_const', const=None,
+            help="Don't compare the results to any baseline.",
+    )
+    parser.add_argument(
+            '-t', '--tolerance', type=float, default=0.5,
+            help="How much slower than the baseline (as a fraction) a result can be before it's considered a regression.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '--save-baseline', action='store_true',
+            help="Overwrite the baseline with the new results, rather than comparing to it.",
+    )
+
+def run(args):
+    subjects = args.subject and [*dict.fromkeys([REFERENCE[0], *args.subject])]
+    times = measure(subjects, batch_size=args.batch_size, repeat=args.repeat)
+    relative = normalize(times)
+    results = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'unit': 'ns',
+            'reference': list(REFERENCE),
+            'times': times,
+            'relative': relative,
+            'overhead': overhead(times),
+    }
+
+    print(format_table(
+        [[name, *times[name].values()] for name in times],
+        header=['ns', *OPERATIONS],
+    ))
+    print()
+    print(format_table(
+        [[name, *relative[name].values()] for name in relative],
+        header=[f'÷ {REFERENCE[0]} {REFERENCE[1]}', *OPERATIONS],
+    ))
+    print()
+    for name, x in results['overhead'].items():
+        print(f"{name} hits are {x:.1f}x slower than overwrite hits")
+
+    if args.output:
+        dump_json(results, args.output)
+
+    if args.save_baseline:
+        dump_json(results, args.baseline)
+        return 0
+
+    if not args.baseline:
+        return 0
+
+    baseline = load_json(args.baseline)
+    regressions = compare_to_baseline(
+            relative, baseline['relative'],
+            tolerance=args.tolerance,
+    )
+
+    print()
+    if not regressions:
+        print(f"No regressions relative to: {args.baseline}")
+        return 0
+
+    print(f"Regressions relative to: {args.baseline}")
+    for (name, op), result, expected in regressions:
+        print(f"  {name} {op}: {result:.2f} (baseline: {expected:.2f})")
+    return 1
+
+def _ns(t):
+    return t * 1e9
+
+def _measure_subject(name, ops, batch_size, repeat):
+    cls = SUBJECTS[name][0]()
+
+    def fresh():
+        return [cls(i) for i in range(batch_size)]
+
+    def warm():
+        batch = fresh()
+        run_hit(batch)
+        return batch
+
+    def warm_reused():
+        # Operations that can be repeated on the same object are timed 
+        # using a small number of objects, so that the cost of fetching 
+        # each object from memory doesn't swamp the cost of the operation.
+        batch = [cls(i) for i in range(REUSED_OBJECTS)]
+        run_hit(batch)
+        return batch * (REUSED_LOOPS * batch_size // REUSED_OBJECTS)
+
+    plan = {
+            'hit': (warm_reused, run_hit),
+            'miss': (fresh, run_hit),
+            'set': (warm_reused, run_set),
+            'delete': (warm, run_delete),
+            'clear': (warm, run_clear),
+            'getter': (warm_reused, run_getter),
+    }
+    return {
+            op: _ns(time_batches(*plan[op], repeat=repeat))
+                if op in ops else None
+            for op in OPERATIONS
+    }
+
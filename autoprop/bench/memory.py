@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+"""
+Measure how much memory cached properties add to each instance.
+
+For each cache policy and each number of cached properties, this benchmark
+creates a class with that many properties, instantiates it many times, and
+then accesses every property of every instance.  The memory allocated by the
+accesses (as measured by :mod:`tracemalloc`) is reported in two ways:
+
+- ``instance``: The average number of bytes added to each instance.
+- ``value``: The average number of bytes added for each cached value.
+
+The getters all return the same preexisting object, so the memory reported is
+purely the overhead of storing the values, not the values themselves.  Plain
+``@property`` and ``@functools.cached_property`` are included for reference.
+"""
+
+import autoprop
+import gc
+import platform
+import sys
+import tracemalloc
+
+from . import (
+        compare_to_baseline, load_json, dump_json, format_table, BASELINE_DIR,
+)
+
+# `functools.cached_property` was added in Python 3.8.
+if sys.version_info >= (3, 8):
+    from functools import cached_property
+else:
+    from backports.cached_property import cached_property
+
+DEFAULT_BASELINE = BASELINE_DIR / 'memory.json'
+DEFAULT_NUM_PROPS = 1, 2, 5, 10, 20, 50
+
+def make_property(num_props):
+    return type('Obj', (), {
+        '__init__': _init,
+        **{f'p{i}': property(_make_getter(f'p{i}')) for i in range(num_props)},
+    })
+
+def make_cached_property(num_props):
+    return type('Obj', (), {
+        '__init__': _init,
+        **{f'p{i}': cached_property(_make_getter(f'p{i}')) for i in range(num_props)},
+    })
+
+def make_autoprop(decorator):
+
+    def make_cls(num_props):
+        cls = type('Obj', (), {
+            '__init__': _init,
+            **{f'get_p{i}': _make_getter(f'get_p{i}') for i in range(num_props)},
+        })
+        return decorator(cls)
+
+    return make_cls
+
+SUBJECTS = {
+        'property': make_property,
+        'cached_property': make_cached_property,
+        'dynamic': make_autoprop(autoprop.dynamic),
+        'overwrite': make_autoprop(autoprop.cache(policy='overwrite')),
+        'manual': make_autoprop(autoprop.cache(policy='manual')),
+        'automatic': make_autoprop(autoprop.cache(policy='automatic', watch=['_x'])),
+        'immutable': make_autoprop(autoprop.immutable),
+}
+
+def measure(subjects=None, num_props=DEFAULT_NUM_PROPS, *, num_instances=1000):
+    """
+    Measure the memory used to cache values for each of the given subjects.
+
+    Returns two nested dictionaries, each mapping subject names and numbers of
+    properties (as strings, to be compatible with JSON) to the number of bytes
+    added per instance and per cached value, respectively.
+    """
+    per_instance = {}
+    per_value = {}
+
+    for name in subjects or SUBJECTS:
+        per_instance[name] = {}
+        per_value[name] = {}
+
+        for n in num_props:
+            cls = SUBJECTS[name](n)
+            nbytes = _measure_cache_bytes(cls, n, num_instances)
+
+            per_instance[name][str(n)] = nbytes / num_instances
+            per_value[name][str(n)] = nbytes / (num_instances * n)
+
+    return per_instance, per_value
+
+def add_arguments(parser):
+    parser.add_argument(
+            '-m', '--instances', type=int, default=1000,
+            help="The number of instances to create.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-p', '--props', type=int, action='append',
+            help="The number of cached properties to define in each class.  May be specified multiple times.  Default: %s" % ', '.join(map(str, DEFAULT_NUM_PROPS)),
+    )
+    parser.add_argument(
+            '-s', '--subject', action='append', choices=list(SUBJECTS),
+            help="Only benchmark the given kind of property.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-o', '--output',
+            help="Write the results to the given JSON file ('-' for stdout).",
+    )
+    parser.add_argument(
+            '-b', '--baseline', default=DEFAULT_BASELINE,
+            help="Compare the results to the given JSON file.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-B', '--no-baseline', dest='baseline', action='store_const', const=None,
+            help="Don't compare the results to any baseline.",
+    )
+    parser.add_argument(
+            '-t', '--tolerance', type=float, default=0.1,
+            help="How much more memory than the baseline (as a fraction) a result can use before it's considered a regression.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '--save-baseline', action='store_true',
+            help="Overwrite the baseline with the new results, rather than comparing to it.",
+    )
+
+def run(args):
+    num_props = args.props or DEFAULT_NUM_PROPS
+    per_instance, per_value = measure(
+            args.subject,
+            num_props,
+            num_instances=args.instances,
+    )
+    results = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'unit': 'bytes',
+            'instances': args.instances,
+            'per_instance': per_instance,
+            'per_value': per_value,
+    }
+    baseline = None
+    if args.baseline and not args.save_baseline:
+        baseline = load_json(args.baseline)
+
+    for key, title in [
+            ('per_instance', 'bytes/instance'),
+            ('per_value', 'bytes/value'),
+    ]:
+        print(_format_results(results[key], baseline and baseline[key], title))
+        print()
+
+    if args.output:
+        dump_json(results, args.output)
+
+    if args.save_baseline:
+        dump_json(results, args.baseline)
+        return 0
+
+    if not baseline:
+        return 0
+
+    regressions = compare_to_baseline(
+            per_instance, baseline['per_instance'],
+            tolerance=args.tolerance,
+    )
+
+    if not regressions:
+        print(f"No regressions relative to: {args.baseline}")
+        return 0
+
+    print(f"Regressions relative to: {args.baseline}")
+    for (name, n), result, expected in regressions:
+        print(f"  {name} ({n} props): {result:.1f} bytes/instance (baseline: {expected:.1f})")
+    return 1
+
+def _init(self, x=None):
+    self._x = x
+
+def _make_getter(name):
+    def getter(self):
+        return self._x
+
+    getter.__name__ = getter.__qualname__ = name
+    return getter
+
+def _measure_cache_bytes(cls, num_props, num_instances):
+    names = [f'p{i}' for i in range(num_props)]
+    objs = [cls() for i in range(num_instances)]
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+
+        for obj in objs:
+            for name in names:
+                getattr(obj, name)
+
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return after - before
+
+def _format_results(results, baseline, title):
+    columns = list(next(iter(results.values())))
+    rows = []
+
+    for name, values in results.items():
+        row = [name]
+        for n, x in values.items():
+            try:
+                x0 = baseline[name][n]
+            except (TypeError, KeyError):
+                row.append(x)
+            else:
+                row.append(f'{x:.1f} ({x - x0:+.1f})')
+        rows.append(row)
+
+    return format_table(rows, header=[title, *columns])
+
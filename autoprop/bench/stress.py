@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+
+"""
+Hammer cached properties from many threads at once, and measure throughput.
+
+Every thread repeatedly accesses the same property of a shared pool of
+objects, and every so often invalidates the cached value instead (e.g. by
+deleting it, clearing the cache, or changing a watched attribute).  The
+number of operations completed per second, by all the threads together, is
+reported for each kind of property and each number of threads.
+
+Every value read by any thread is also checked, and the run fails if a thread
+ever sees something that the getter couldn't have returned, if any operation
+raises an unexpected exception, or if any ``automatic`` property is out of
+date once all the threads have finished.  This is mostly meant for finding
+races on free-threaded builds of Python, where threads really do run at the
+same time.  With the GIL, the throughput can't increase with the number of
+threads, and is only useful for comparing the different kinds of property.
+Races can still be found with the GIL by making threads switch much more
+often than usual, e.g. ``--switch-interval 1e-6``.
+"""
+
+import autoprop
+import platform
+import sys
+
+from . import dump_json, format_table
+from .threads import _run_threads
+
+DEFAULT_THREADS = 1, 2, 4, 8
+
+class State:
+    pass
+
+def make_property():
+
+    class Obj:
+
+        def __init__(self):
+            self._x = State()
+
+        @property
+        def x(self):
+            return 'x', self._x
+
+    return Obj, _change_state
+
+def make_autoprop(decorator, invalidate, slots=False):
+
+    @decorator
+    class Obj:
+        if slots:
+            __slots__ = '_x',
+
+        def __init__(self):
+            self._x = State()
+
+        def get_x(self):
+            return 'x', self._x
+
+    return Obj, invalidate
+
+def _change_state(obj):
+    obj._x = State()
+
+def _delete_x(obj):
+    try:
+        del obj.x
+    except AttributeError:
+        # Another thread deleted the value first.
+        pass
+
+def _del_cached_x(obj):
+    try:
+        autoprop.del_cached_attr(obj, 'x')
+    except AttributeError:
+        pass
+
+def _set_cached_x(obj):
+    autoprop.set_cached_attr(obj, 'x', ('x', obj._x))
+
+SUBJECTS = {
+        'property': make_property,
+        'overwrite': lambda: make_autoprop(
+            autoprop.cache(policy='overwrite'),
+            _delete_x,
+        ),
+        'manual': lambda: make_autoprop(
+            autoprop.cache(policy='manual'),
+            _del_cached_x,
+        ),
+        'manual, set': lambda: make_autoprop(
+            autoprop.cache(policy='manual'),
+            _set_cached_x,
+        ),
+        'automatic': lambda: make_autoprop(
+            autoprop.cache(policy='automatic', watch=['_x']),
+            _change_state,
+        ),
+        'automatic, delete': lambda: make_autoprop(
+            autoprop.cache(policy='automatic', watch=['_x']),
+            _del_cached_x,
+        ),
+        'immutable': lambda: make_autoprop(
+            autoprop.immutable,
+            autoprop.clear_cache,
+        ),
+        'slots': lambda: make_autoprop(
+            autoprop.cache(policy='automatic', watch=['_x']),
+            _change_state,
+            slots=True,
+        ),
+}
+
+def measure(subjects=None, num_threads=DEFAULT_THREADS, *, num_objects=16, num_ops=20000, invalidate_every=10, switch_interval=None):
+    """
+    Hammer each of the given subjects with each number of threads.
+
+    Returns a nested dictionary mapping subject names and numbers of threads
+    (as strings, to be compatible with JSON) to the number of operations per
+    second, and a list of descriptions of any inconsistencies that were
+    found.
+    """
+    prev_switch_interval = sys.getswitchinterval()
+    if switch_interval is not None:
+        sys.setswitchinterval(switch_interval)
+
+    try:
+        return _measure(
+                subjects, num_threads, num_objects, num_ops, invalidate_every)
+    finally:
+        sys.setswitchinterval(prev_switch_interval)
+
+def add_arguments(parser):
+    parser.add_argument(
+            '-n', '--objects', type=int, default=16,
+            help="The number of objects shared by all the threads.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-N', '--ops', type=int, default=20000,
+            help="The number of operations each thread performs.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-i', '--invalidate-every', type=int, default=10,
+            help="Invalidate a cached value instead of reading it once every this many operations.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-S', '--switch-interval', type=float,
+            help="How often (in seconds) threads holding the GIL should be asked to let other threads run.  See `sys.setswitchinterval()`.",
+    )
+    parser.add_argument(
+            '-T', '--threads', type=int, action='append',
+            help="The number of threads to use.  May be specified multiple times.  Default: %s" % ', '.join(map(str, DEFAULT_THREADS)),
+    )
+    parser.add_argument(
+            '-s', '--subject', action='append', choices=list(SUBJECTS),
+            help="Only benchmark the given kind of property.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-o', '--output',
+            help="Write the results to the given JSON file ('-' for stdout).",
+    )
+
+def run(args):
+    num_threads = args.threads or DEFAULT_THREADS
+    throughput, errors = measure(
+            args.subject,
+            num_threads,
+            num_objects=args.objects,
+            num_ops=args.ops,
+            invalidate_every=args.invalidate_every,
+            switch_interval=args.switch_interval,
+    )
+    results = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'gil': _is_gil_enabled(),
+            'objects': args.objects,
+            'ops': args.ops,
+            'invalidate_every': args.invalidate_every,
+            'switch_interval': args.switch_interval,
+            'throughput': throughput,
+            'errors': errors,
+    }
+
+    print(format_table(
+        [[name, *(x / 1e3 for x in v.values())] for name, v in throughput.items()],
+        header=['kops/s \\ threads', *map(str, num_threads)],
+    ))
+
+    if args.output:
+        dump_json(results, args.output)
+
+    if errors:
+        print()
+        print("Inconsistencies:")
+        for error in errors:
+            print(f"  {error}")
+        return 1
+
+    return 0
+
+def _measure(subjects, num_threads, num_objects, num_ops, invalidate_every):
+    throughput = {}
+    errors = []
+
+    for name in subjects or SUBJECTS:
+        cls, invalidate = SUBJECTS[name]()
+        throughput[name] = {}
+
+        for n in num_threads:
+            objs = [cls() for _ in range(num_objects)]
+            thread_errors = []
+
+            def hammer(offset):
+                for i in range(num_ops):
+                    obj = objs[(i + offset) % num_objects]
+                    try:
+                        if i % invalidate_every:
+                            _check_value(obj.x)
+                        else:
+                            invalidate(obj)
+                    except Exception as err:
+                        thread_errors.append(err)
+
+            t = _run_threads(hammer, range(n))
+            throughput[name][str(n)] = n * num_ops / t
+
+            errors += [
+                    f'{name} ({n} threads): {err!r}'
+                    for err in thread_errors[:3]
+            ]
+            errors += [
+                    f'{name} ({n} threads): {problem}'
+                    for problem in _check_final(name, objs)
+            ]
+
+    return throughput, errors
+
+def _check_value(value):
+    if type(value) is not tuple or value[0] != 'x' or type(value[1]) is not State:
+        raise AssertionError(f"unexpected value: {value!r}")
+
+def _check_final(name, objs):
+    # Once the threads are done, `automatic` properties must reflect the final
+    # state of the objects they watch, no matter how the writes interleaved.
+    if not name.startswith(('automatic', 'slots')):
+        return []
+
+    return [
+            f"stale value for object {i}"
+            for i, obj in enumerate(objs)
+            if obj.x[1] is not obj._x
+    ]
+
+def _is_gil_enabled():
+    try:
+        return sys._is_gil_enabled()
+    except AttributeError:
+        return True
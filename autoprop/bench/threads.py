@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+"""
+Measure how cached properties behave when many threads access them at once.
+
+Every property in this benchmark has a getter that sleeps briefly, like a
+getter that waits for I/O, so several threads could compute values at the
+same time.  Two scenarios are measured for each kind of property and each
+number of threads:
+
+- ``speedup``: Each thread accesses a property of its own objects for the
+  first time.  The number of values computed per second is reported relative
+  to a single thread.  Ideally this would equal the number of threads, but
+  ``@functools.cached_property`` holds a lock shared by every instance of the
+  class while computing values (before Python 3.12), so it can't compute more
+  than one value at a time.
+
+- ``calls``: Every thread accesses the same property of the same objects at
+  once.  The average number of times the getter was called for each object is
+  reported.  Ideally this would be 1, but properties that don't coordinate
+  between threads (e.g. without ``lock=True`` or ``single_flight=True``) may
+  compute the same value once per thread.
+
+These results depend too much on how threads are scheduled to be compared
+against a baseline.
+"""
+
+import autoprop
+import platform
+import sys
+
+from . import dump_json, format_table
+from threading import Barrier, Thread
+from time import perf_counter, sleep
+
+# `functools.cached_property` was added in Python 3.8.
+if sys.version_info >= (3, 8):
+    from functools import cached_property
+else:
+    from backports.cached_property import cached_property
+
+DEFAULT_THREADS = 1, 2, 4, 8
+DELAY = 0.001
+
+def make_cached_property():
+
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+            self._calls = []
+
+        @cached_property
+        def x(self):
+            return _slow_getter(self)
+
+    return Obj
+
+def make_autoprop(decorator):
+
+    @decorator
+    class Obj:
+
+        def __init__(self, x):
+            self._x = x
+            self._calls = []
+
+        def get_x(self):
+            return _slow_getter(self)
+
+    return Obj
+
+SUBJECTS = {
+        'cached_property': make_cached_property,
+        'overwrite': lambda: make_autoprop(
+            autoprop.cache(policy='overwrite'),
+        ),
+        'overwrite, lock': lambda: make_autoprop(
+            autoprop.cache(policy='overwrite', lock=True),
+        ),
+        'manual': lambda: make_autoprop(
+            autoprop.cache(policy='manual'),
+        ),
+        'manual, single flight': lambda: make_autoprop(
+            autoprop.cache(policy='manual', single_flight=True),
+        ),
+        'automatic': lambda: make_autoprop(
+            autoprop.cache(policy='automatic', watch=['_x']),
+        ),
+        'immutable': lambda: make_autoprop(
+            autoprop.immutable,
+        ),
+}
+
+def measure(subjects=None, num_threads=DEFAULT_THREADS, *, num_objects=20):
+    """
+    Measure both scenarios for each of the given subjects.
+
+    Returns two nested dictionaries, each mapping subject names and numbers of
+    threads (as strings, to be compatible with JSON) to the speedup and the
+    number of calls per object, respectively.
+    """
+    speedup = {}
+    calls = {}
+
+    for name in subjects or SUBJECTS:
+        cls = SUBJECTS[name]()
+        speedup[name] = {}
+        calls[name] = {}
+
+        t1 = _time_separate(cls, 1, num_objects)
+
+        for n in num_threads:
+            t = _time_separate(cls, n, num_objects)
+            speedup[name][str(n)] = n * t1 / t
+            calls[name][str(n)] = _count_shared_calls(cls, n, num_objects)
+
+    return speedup, calls
+
+def add_arguments(parser):
+    parser.add_argument(
+            '-n', '--objects', type=int, default=20,
+            help="The number of objects each thread accesses.  Default: %(default)s",
+    )
+    parser.add_argument(
+            '-T', '--threads', type=int, action='append',
+            help="The number of threads to use.  May be specified multiple times.  Default: %s" % ', '.join(map(str, DEFAULT_THREADS)),
+    )
+    parser.add_argument(
+            '-s', '--subject', action='append', choices=list(SUBJECTS),
+            help="Only benchmark the given kind of property.  May be specified multiple times.",
+    )
+    parser.add_argument(
+            '-o', '--output',
+            help="Write the results to the given JSON file ('-' for stdout).",
+    )
+
+def run(args):
+    num_threads = args.threads or DEFAULT_THREADS
+    speedup, calls = measure(
+            args.subject,
+            num_threads,
+            num_objects=args.objects,
+    )
+    results = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'objects': args.objects,
+            'speedup': speedup,
+            'calls': calls,
+    }
+
+    for key, title in [
+            ('speedup', 'speedup'),
+            ('calls', 'calls/object'),
+    ]:
+        print(format_table(
+            [[name, *x.values()] for name, x in results[key].items()],
+            header=[f'{title} \\ threads', *map(str, num_threads)],
+        ))
+        print()
+
+    if args.output:
+        dump_json(results, args.output)
+
+    return 0
+
+def _slow_getter(self):
+    # `list.append()` is atomic, so this counts every call even if several
+    # threads make calls at the same time.
+    self._calls.append(None)
+    sleep(DELAY)
+    return self._x
+
+def _time_separate(cls, num_threads, num_objects):
+    batches = [
+            [cls(i) for i in range(num_objects)]
+            for _ in range(num_threads)
+    ]
+
+    def access(batch):
+        for obj in batch:
+            obj.x
+
+    return _run_threads(access, batches)
+
+def _count_shared_calls(cls, num_threads, num_objects):
+    batch = [cls(i) for i in range(num_objects)]
+
+    def access(batch):
+        for obj in batch:
+            obj.x
+
+    _run_threads(access, [batch] * num_threads)
+    return sum(len(obj._calls) for obj in batch) / num_objects
+
+def _run_threads(f, batches):
+    # Start all the threads at the same time, and time how long it takes for
+    # all of them to finish.
+    barrier = Barrier(len(batches) + 1)
+
+    def target(batch):
+        barrier.wait()
+        f(batch)
+
+    threads = [Thread(target=target, args=(x,)) for x in batches]
+    for thread in threads:
+        thread.start()
+
+    barrier.wait()
+    t0 = perf_counter()
+
+    for thread in threads:
+        thread.join()
+
+    return perf_counter() - t0
@@ -1,80 +1,1708 @@
 #!/usr/bin/env python3
 
+import sys
+import threading
+import weakref
+
+from contextlib import contextmanager
+from functools import partial, wraps
+from types import FunctionType, CodeType
+
 _CACHE_ATTR = '__autoprop_cache'
-_SET_BY_USER = object()
+_LAYOUT_ATTR = '__autoprop_layout'
+_STORAGE_ATTR = '__autoprop_storage'
+
+class _Placeholder:
+    # Records and memos can be pickled or copied along with the objects they 
+    # belong to, so the placeholders they contain have to stay the same 
+    # objects.  Otherwise empty entries would look like cached values.
+    __slots__ = 'name',
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f'<autoprop placeholder: {self.name}>'
+
+    def __reduce__(self):
+        return self.name
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+_SET_BY_USER = _Placeholder('_SET_BY_USER')
+_EMPTY = _Placeholder('_EMPTY')
+_UNDEFINED = object()
 _UNSPECIFIED = object()
 
-class Cache:
+# Each instance stores its cached values in a "record", which is just a list.  
+# Each class has a layout that assigns every cached property an index into 
+# that list, plus a second index for the memo if the property is `automatic`.  
+# The descriptors remember their own indices, so a cache hit is just a list 
+# lookup.  Empty slots are filled with `_EMPTY`.
+#
+# The hit paths below are written as module-level functions, rather than as 
+# methods, so that the cache attribute can be referenced by name without being 
+# mangled.  Each access is on the critical path, so everything that doesn't 
+# need to happen on a hit (e.g. checking for class attribute access, creating 
+# the record) is deferred until the first lookup fails.
 
-    def __init__(self, obj):
+class Layout:
+    """
+    The position of each cached value in the records of one class.
+
+    A class starts with the layout of its first base class, so that the 
+    properties it inherits from that base can use the same indices.  Any 
+    properties inherited from other bases that end up with different indices 
+    are copied into the class itself the first time a record is made for one 
+    of its instances, or as soon as a base that's decorated later adds them.  
+    Layouts only ever grow, so records made before a property is added remain 
+    valid.
+
+    Properties that store their values in slots, rather than in the record, 
+    are listed separately, as are properties that cache awaitables or futures 
+    (along with a function to wrap plain values in the same way).  The layout 
+    also remembers the storage for the class, so that it can be found quickly.
+
+    Properties made with ``versioned=True`` also use a memo slot to hold the 
+    current version of the attributes they watch.  These versions are named 
+    after the attributes, and the layout keeps track of which versions need 
+    to be replaced when each attribute changes.  Versioned properties can 
+    watch each other, so this includes the versions of every property that 
+    depends on the attribute indirectly.
+    """
+    __slots__ = (
+            'values', 'memos', 'size', 'conflicts', 'slots', 'wrappers',
+            'versioned', 'watchers', 'bumps', 'storage',
+    )
+
+    def __init__(self, bases=()):
         self.values = {}
         self.memos = {}
+        self.size = 0
+        self.conflicts = set()
+        self.slots = {}
+        self.wrappers = {}
+        self.versioned = {}
+        self.watchers = {}
+        self.bumps = {}
+        self.storage = bases[0].storage if bases else _DEFAULT_STORAGE
+
+        for base in reversed(bases):
+            self.slots.update(base.slots)
+            self.wrappers.update(base.wrappers)
+            self.versioned.update(base.versioned)
+
+            for attr, keys in base.watchers.items():
+                self._add_watchers(attr, keys)
+
+        if self.watchers:
+            self._update_bumps()
+
+        if bases:
+            self.values.update(bases[0].values)
+            self.memos.update(bases[0].memos)
+            self.size = bases[0].size
+            self.conflicts.update(bases[0].conflicts)
+
+        for base in bases[1:]:
+            self._merge(base)
+
+    def update(self, bases):
+        # Base classes can gain properties after this layout is made, e.g. if 
+        # they're decorated after this class is defined.  Add the new names 
+        # without changing any existing indices, since records may already be 
+        # using them.
+        for base in bases:
+            for name, members in base.slots.items():
+                self.slots.setdefault(name, members)
+            for name, wrapper in base.wrappers.items():
+                self.wrappers.setdefault(name, wrapper)
+            for name, key in base.versioned.items():
+                self.versioned.setdefault(name, key)
+            for attr, keys in base.watchers.items():
+                self._add_watchers(attr, keys)
+
+            self._merge(base)
+
+        self._update_bumps()
+
+    def _merge(self, base):
+        for indices, base_indices in [
+                (self.values, base.values),
+                (self.memos, base.memos),
+        ]:
+            for name, base_index in base_indices.items():
+                index = indices.get(name)
+                if index is None:
+                    index = self._allocate(indices, name)
+                if index != base_index:
+                    self.conflicts.add(name)
+
+        # Versioned properties also need to be copied if their versions end up 
+        # with different indices.
+        for name, key in base.versioned.items():
+            if base.memos[key] != self.memos[key]:
+                self.conflicts.add(name)
+
+    # New names are allocated for every property of every decorated class, so 
+    # avoid raising `KeyError` for them.
+
+    def index(self, name):
+        index = self.values.get(name)
+        if index is None:
+            index = self._allocate(self.values, name)
+        return index
+
+    def memo_index(self, name):
+        index = self.memos.get(name)
+        if index is None:
+            index = self._allocate(self.memos, name)
+        return index
+
+    def version_index(self, name, key, watch):
+        index = self.memo_index(key)
+
+        with _LAYOUT_LOCK:
+            self.versioned[name] = key
+            for attr in watch:
+                self._add_watchers(attr, (key,))
+                _VERSIONED_ATTRS.add(attr)
+
+            self._update_bumps()
+
+        return index
+
+    def _add_watchers(self, attr, keys):
+        prev = self.watchers.get(attr, ())
+        self.watchers[attr] = prev + tuple(x for x in keys if x not in prev)
+
+    def _update_bumps(self):
+        # When an attribute changes, so do the versioned properties that 
+        # watch it, and so on.  Follow these chains in advance, so that each 
+        # change can replace every version that depends on it in one pass, 
+        # and properties never have to check whether the properties they 
+        # watch are up to date.
+        props = {}
+        for name, key in self.versioned.items():
+            props.setdefault(key, []).append(name)
+
+        bumps = {}
+        for attr in self.watchers:
+            keys = {}
+            todo = [attr]
+            while todo:
+                for key in self.watchers.get(todo.pop(), ()):
+                    if key not in keys:
+                        keys[key] = None
+                        todo += props.get(key, ())
+            bumps[attr] = tuple(keys)
+
+        # Replace the whole table, so that other threads never see it half 
+        # updated.
+        self.bumps = bumps
+
+    def _allocate(self, indices, name):
+        # Indices can be allocated while other threads are using the layout 
+        # (e.g. by `set_cached_attr()`), so make sure that no two names get 
+        # the same index, and that the size covers an index before anyone can 
+        # see it.
+        with _LAYOUT_LOCK:
+            index = indices.get(name)
+            if index is None:
+                index = self.size
+                self.size = index + 1
+                indices[name] = index
+            return index
+
+def _get_cached(self, obj, owner=None):
+    try:
+        value = obj.__autoprop_cache[self.index]
+        if value is not _EMPTY:
+            return value
+    except (AttributeError, IndexError):
+        pass
+
+    # Class attribute access (e.g. for docstrings): 
+    if obj is None:
+        return self
+
+    value = property.__get__(self, obj, owner)
+    layout = _get_layout(type(obj))
+    index = layout.index(self.name)
+    _get_record(obj, layout)[index] = value
+    return value
+
+def _get_conditional(self, obj, owner=None):
+    if obj is None:
+        return self
+
+    curr_memo = self.refresh(obj)
+
+    try:
+        record = obj.__autoprop_cache
+        prev_memo = record[self.memo_index]
+    except (AttributeError, IndexError):
+        pass
+    else:
+        if prev_memo == curr_memo or prev_memo is _SET_BY_USER:
+            # Values are written before their memos and erased after them, 
+            # so the value can only be missing if it was deleted since the 
+            # memo was read.
+            value = record[self.index]
+            if value is not _EMPTY:
+                return value
+
+    value = property.__get__(self, obj, owner)
+    layout = _get_layout(type(obj))
+    index = layout.index(self.name)
+    memo_index = layout.memo_index(self.name)
+    record = _get_record(obj, layout)
+
+    # The value and its memo must be written together, or else two threads 
+    # could leave one's value paired with the other's memo.
+    lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+    lock.acquire()
+    try:
+        record[index] = value
+        record[memo_index] = curr_memo
+    finally:
+        lock.release()
+
+    return value
 
 class CachedProperty(property):
+    __slots__ = 'name', 'index', '__doc__'
+    __get__ = _get_cached
 
     def __set_name__(self, owner, name):
+        layout = _get_layout(owner)
         self.name = name
+        self.index = layout.index(name)
+        _note_getter(layout, name, self.fget)
 
-    def __get__(self, obj, owner=None):
-        # Class attribute access (e.g. for docstrings): 
-        if obj is None:
-            return super().__get__(obj, owner)
+    def _copy(self):
+        return type(self)(self.fget, self.fset, self.fdel, self.__doc__)
+
+class ConditionalCachedProperty(property):
+    __slots__ = 'name', 'index', 'memo_index', 'memo_manager', 'refresh', '__doc__'
+    __get__ = _get_conditional
+
+    def __init__(self, getter, setter, deleter, memo_manager):
+        super().__init__(getter, setter, deleter)
+        self.memo_manager = memo_manager
+        self.refresh = memo_manager.refresh
+
+    def __set_name__(self, owner, name):
+        layout = _get_layout(owner)
+        self.name = name
+        self.index = layout.index(name)
+        self.memo_index = layout.memo_index(name)
+        _note_getter(layout, name, self.fget)
+
+    def _copy(self):
+        copy = type(self)(self.fget, self.fset, self.fdel, self.memo_manager)
+        copy.__doc__ = self.__doc__
+        return copy
+
+def _get_versioned(self, obj, owner=None):
+    try:
+        record = obj.__autoprop_cache
+        memo = record[self.memo_index]
+        if memo == record[self.version_index] or memo is _SET_BY_USER:
+            value = record[self.index]
+            if value is not _EMPTY:
+                return value
+    except (AttributeError, IndexError):
+        pass
+
+    # Class attribute access (e.g. for docstrings): 
+    if obj is None:
+        return self
+
+    layout = _get_layout(type(obj))
+    index = layout.index(self.name)
+    memo_index = layout.memo_index(self.name)
+    version_index = layout.memo_index(self.version_key)
+    record = _get_record(obj, layout)
+
+    # Read the version before calling the getter, so that any changes made 
+    # while the getter is running will cause the value to be recalculated.
+    version = record[version_index]
+    value = property.__get__(self, obj, owner)
+
+    lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+    lock.acquire()
+    try:
+        record[index] = value
+        record[memo_index] = version
+    finally:
+        lock.release()
+
+    return value
+
+# A conditional cached property that's recalculated when the attributes it 
+# watches are assigned or deleted.  Rather than checking the watched 
+# attributes every time the value is accessed, the class is given 
+# `__setattr__()` and `__delattr__()` hooks that give the watched attributes 
+# a new version every time one of them changes.  A cache hit just compares 
+# that version to the one the value was calculated with.  Only changes made 
+# by assigning or deleting the watched attributes themselves are noticed, so 
+# the watched attributes must be plain attribute names.  (This is a comment 
+# rather than a docstring, because `__doc__` is a slot.)
+
+class VersionedCachedProperty(ConditionalCachedProperty):
+    __slots__ = 'version_key', 'version_index'
+    __doc__ = ConditionalCachedProperty.__dict__['__doc__']
+    __get__ = _get_versioned
+
+    def __init__(self, getter, setter, deleter, memo_manager):
+        super().__init__(getter, setter, deleter, memo_manager)
+        self.version_key = 'version: ' + ', '.join(memo_manager.watch)
+
+    def __set_name__(self, owner, name):
+        super().__set_name__(owner, name)
+        self.version_index = _get_layout(owner).version_index(
+                name, self.version_key, self.memo_manager.watch,
+        )
+        _install_version_hooks(owner)
+
+def _install_version_hooks(cls):
+    # The hooks find the versions to replace via the layout of each object's 
+    # class, so subclasses can reuse the hooks of their bases.
+    if getattr(cls.__setattr__, '__code__', None) is _VERSION_SETATTR_CODE:
+        return
+
+    setattr_, delattr_ = _make_version_hooks(cls.__setattr__, cls.__delattr__)
+    setattr_.__qualname__ = f'{cls.__qualname__}.__setattr__'
+    delattr_.__qualname__ = f'{cls.__qualname__}.__delattr__'
 
-        # Instance attribute access:
-        cache = get_cache(obj)
-        attr = self.name
+    type.__setattr__(cls, '__setattr__', setattr_)
+    type.__setattr__(cls, '__delattr__', delattr_)
 
+def _make_version_hooks(base_setattr, base_delattr):
+    # Replace the versions after changing the attribute.  Otherwise, a getter 
+    # running in another thread could see the old value of the attribute 
+    # together with the new version.
+
+    def __setattr__(self, name, value):
+        base_setattr(self, name, value)
+        if name in _VERSIONED_ATTRS:
+            _bump_versions(self, name)
+
+    def __delattr__(self, name):
+        base_delattr(self, name)
+        if name in _VERSIONED_ATTRS:
+            _bump_versions(self, name)
+
+    return __setattr__, __delattr__
+
+_VERSION_SETATTR_CODE = _make_version_hooks(None, None)[0].__code__
+
+def _bump_versions(obj, name):
+    layout = _get_layout(type(obj))
+    keys = layout.bumps.get(name)
+    if not keys:
+        return
+
+    # If the object doesn't have a record yet, it can't have any cached 
+    # values that would need to be recalculated.
+    record = getattr(obj, _CACHE_ATTR, None)
+    if record is None:
+        return
+
+    # Each version is a new object, rather than an incremented count, so 
+    # that no lock is needed.  Two threads incrementing the same count could 
+    # both write the same number, and a number could be reused after a value 
+    # was cached with it.  An object can't be reused while a memo still 
+    # refers to it.
+    for key in keys:
+        index = layout.memos[key]
+        if index < len(record):
+            record[index] = object()
+
+def _get_tracked(self, obj, owner=None):
+    try:
+        record = obj.__autoprop_cache
+        memo = record[self.memo_index]
+    except (AttributeError, IndexError):
+        pass
+    else:
+        # Each memo includes the names of the attributes it depends on, 
+        # because each value can depend on different attributes.  The names 
+        # are stored (as a key for the function that refreshes them) rather 
+        # than the function itself, so that records can still be pickled.  A memo from another process might 
+        # not have a refresh function yet, in which case the value is just 
+        # recalculated.
         try:
-            return cache.values[attr]
+            if memo is _SET_BY_USER or (
+                    memo is not _EMPTY and
+                    self.refreshers[memo[0]](obj) == memo[1]):
+                value = record[self.index]
+                if value is not _EMPTY:
+                    return value
         except KeyError:
-            value = super().__get__(obj, owner)
-            cache.values[attr] = value
-            return value
+            pass
 
-class ConditionalCachedProperty(property):
+    # Class attribute access (e.g. for docstrings): 
+    if obj is None:
+        return self
+
+    layout = _get_layout(type(obj))
+    index = layout.index(self.name)
+    memo_index = layout.memo_index(self.name)
+    record = _get_record(obj, layout)
+
+    # The memo is made from the values the getter actually read, rather than 
+    # by reading them again afterwards, so that any changes made while the 
+    # getter is running will cause the value to be recalculated.
+    recording = _start_recording(obj)
+    try:
+        value = property.__get__(self, obj, owner)
+    finally:
+        _stop_recording(recording)
+
+    reads = recording.reads
+    names = tuple(k for k in reads if k not in recording.writes)
+    ids = [id(reads[k]) for k in names]
+    memo = (
+            self.memo_manager.key_for(names),
+            ids[0] if len(ids) == 1 else tuple(ids),
+    )
+
+    lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+    lock.acquire()
+    try:
+        record[index] = value
+        record[memo_index] = memo
+    finally:
+        lock.release()
+
+    return value
+
+class TrackedCachedProperty(property):
+    __slots__ = (
+            'name', 'index', 'memo_index', 'memo_manager', 'refreshers',
+            '__doc__',
+    )
+    __get__ = _get_tracked
 
     def __init__(self, getter, setter, deleter, memo_manager):
         super().__init__(getter, setter, deleter)
         self.memo_manager = memo_manager
+        self.refreshers = memo_manager.refreshers
 
     def __set_name__(self, owner, name):
+        layout = _get_layout(owner)
         self.name = name
+        self.index = layout.index(name)
+        self.memo_index = layout.memo_index(name)
+        _note_getter(layout, name, self.fget)
+
+    def _copy(self):
+        copy = type(self)(self.fget, self.fset, self.fdel, self.memo_manager)
+        copy.__doc__ = self.__doc__
+        return copy
+
+# Tracked properties call their getters with the object itself.  While a 
+# value is being calculated, the class of the object is given 
+# `__getattribute__()`, `__setattr__()`, and `__delattr__()` hooks that record 
+# the attributes that are read from (or assigned to) that object.  The hooks 
+# are removed again once no calculations for that class are in progress, so 
+# cache hits and other attribute accesses don't pay for them.  Each thread 
+# has its own stack of recordings, because tracked properties can depend on 
+# each other, and instances can be used by other threads in the meantime.
+
+class _Recording:
+    __slots__ = 'obj', 'reads', 'writes'
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.reads = {}
+        self.writes = set()
+
+_RECORDINGS = {}
+_HOOKED_CLASSES = {}
+_HOOKS_LOCK = threading.Lock()
+_HOOK_NAMES = '__getattribute__', '__setattr__', '__delattr__'
+
+def _start_recording(obj):
+    cls = type(obj)
+
+    with _HOOKS_LOCK:
+        try:
+            _HOOKED_CLASSES[cls][0] += 1
+        except KeyError:
+            prev = {k: cls.__dict__[k] for k in _HOOK_NAMES if k in cls.__dict__}
+            hooks = _make_tracking_hooks(
+                    cls.__getattribute__, cls.__setattr__, cls.__delattr__,
+            )
+            for hook in hooks:
+                hook.__qualname__ = f'{cls.__qualname__}.{hook.__name__}'
+                type.__setattr__(cls, hook.__name__, hook)
+
+            _HOOKED_CLASSES[cls] = [1, prev]
+
+    recording = _Recording(obj)
+    _RECORDINGS.setdefault(threading.get_ident(), []).append(recording)
+    return recording
+
+def _stop_recording(recording):
+    ident = threading.get_ident()
+    stack = _RECORDINGS[ident]
+    stack.pop()
+    if not stack:
+        del _RECORDINGS[ident]
+
+    cls = type(recording.obj)
+
+    with _HOOKS_LOCK:
+        hooked = _HOOKED_CLASSES[cls]
+        hooked[0] -= 1
+        if hooked[0]:
+            return
+
+        del _HOOKED_CLASSES[cls]
+        for name in _HOOK_NAMES:
+            if name in hooked[1]:
+                type.__setattr__(cls, name, hooked[1][name])
+            else:
+                type.__delattr__(cls, name)
+
+def _make_tracking_hooks(base_getattribute, base_setattr, base_delattr):
+
+    def __getattribute__(self, name):
+        try:
+            value = base_getattribute(self, name)
+        except AttributeError:
+            # Attributes that don't exist yet are dependencies too, unless 
+            # `__getattr__()` is about to provide them.
+            if not hasattr(type(self), '__getattr__'):
+                _note_read(self, name, _UNDEFINED)
+            raise
+
+        _note_read(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        base_setattr(self, name, value)
+        _note_write(self, name)
+
+    def __delattr__(self, name):
+        base_delattr(self, name)
+        _note_write(self, name)
+
+    return __getattribute__, __setattr__, __delattr__
+
+def _find_recording(obj):
+    stack = _RECORDINGS.get(threading.get_ident())
+    if stack and stack[-1].obj is obj:
+        return stack[-1]
+
+def _note_read(obj, name, value):
+    recording = _find_recording(obj)
+    if recording is None or name in recording.reads:
+        return
+
+    # Special attributes (including the cache itself) aren't dependencies.
+    if name.startswith('__'):
+        return
+
+    # Only instance attributes and data descriptors (e.g. slots and cached 
+    # properties) are recorded, because other class attributes don't belong 
+    # to the object.  Methods and uncached properties aren't recorded 
+    # either, but the attributes they read are.
+    descr = _lookup_static(type(obj), name)
+
+    if descr is _UNDEFINED or isinstance(descr, _CACHED_PROPERTIES):
+        is_recorded = True
+    elif hasattr(type(descr), '__set__'):
+        is_recorded = not isinstance(descr, property)
+    else:
+        # Only look at the instance dictionary if it could be hiding a class 
+        # attribute, because accessing `__dict__` makes every other attribute 
+        # access on the object slower.
+        try:
+            is_recorded = name in object.__getattribute__(obj, '__dict__')
+        except AttributeError:
+            is_recorded = False
+
+    if is_recorded:
+        recording.reads[name] = value
+
+def _note_write(obj, name):
+    # Attributes that the getter assigns itself (e.g. counters) aren't 
+    # dependencies.
+    recording = _find_recording(obj)
+    if recording is not None:
+        recording.writes.add(name)
+
+def _lookup_static(cls, name):
+    # Find a class attribute without invoking any descriptors.
+    for base in cls.__mro__:
+        try:
+            return base.__dict__[name]
+        except KeyError:
+            pass
+
+    return _UNDEFINED
+
+class OverwriteCachedProperty:
+    """
+    Cache values by overwriting the property in the instance dictionary.
+
+    This is equivalent to :class:`functools.cached_property`, except that it 
+    doesn't hold a lock shared by every instance of the class while the value 
+    is computed (as :class:`functools.cached_property` does before Python 
+    3.12).  If several threads compute the value at the same time, they all 
+    return whichever value was stored first.  If *lock* is true, only one 
+    thread at a time can compute the properties of any one instance, and the 
+    others wait to use its result.
+    """
+    def __init__(self, func, *, lock=False):
+        self.func = func
+        self.attrname = None
+        self.lock = lock
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner, name):
+        self.attrname = name
+        _note_getter(_get_layout(owner), name, self.func)
 
     def __get__(self, obj, owner=None):
-        # Class attribute access (e.g. for docstrings): 
+        # This is only called on a miss, because the value is stored in the 
+        # instance dictionary, and this isn't a data descriptor.
         if obj is None:
-            return super().__get__(obj, owner)
+            return self
 
-        # Instance attribute access:
-        cache = get_cache(obj)
-        attr = self.name
-        manager = self.memo_manager
-        curr_memo = manager.refresh(obj)
+        try:
+            cache = obj.__dict__
+        except AttributeError:
+            raise TypeError(f"can't cache {self.attrname!r} for {type(obj).__qualname__} objects; they don't have instance dictionaries") from None
+
+        if not self.lock:
+            # Bypass any custom `__setattr__()`, like `cached_property`.
+            return cache.setdefault(self.attrname, self.func(obj))
+
+        with _INSTANCE_LOCKS.hold(id(obj)):
+            try:
+                return cache[self.attrname]
+            except KeyError:
+                pass
+
+            value = cache[self.attrname] = self.func(obj)
+            return value
+
+class _KeyedLocks:
+    """
+    Lend out a lock for each key, for only as long as it's being used.
+
+    This makes it possible to lock individual objects without storing a lock 
+    in each one.  Objects can be identified by `id`, because they must be 
+    alive while they are locked.
+    """
+    __slots__ = 'factory', 'guard', 'locks'
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.guard = threading.Lock()
+        self.locks = {}
+
+    @contextmanager
+    def hold(self, key):
+        with self.guard:
+            entry = self.locks.get(key)
+            if entry is None:
+                entry = self.locks[key] = [self.factory(), 0]
+            entry[1] += 1
 
         try:
-            prev_memo = cache.memos[attr]
-        except KeyError:
-            is_fresh = False
+            with entry[0]:
+                yield
+        finally:
+            with self.guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.locks[key]
+
+# Reentrant, so that a getter can access other properties of the same object.
+_INSTANCE_LOCKS = _KeyedLocks(threading.RLock)
+
+# Locks for making records, and for writing cached values together with their 
+# memos.  Writing a single value is already atomic, but two threads writing 
+# pairs at the same time could otherwise leave one's value with the other's 
+# memo.  No user code runs while these locks are held, so a fixed number of 
+# them can be shared by every object, chosen by `id`.  The low bits of an `id` 
+# are skipped because they're always the same, since objects are aligned in 
+# memory.  The locks are reentrant in case garbage collection runs a finalizer 
+# that accesses cached properties while one is held.  They're acquired and 
+# released explicitly, because that's about twice as fast as using a `with` 
+# block.
+_WRITE_LOCK_MASK = 63
+_WRITE_LOCKS = [threading.RLock() for _ in range(_WRITE_LOCK_MASK + 1)]
+
+# Reentrant, because making a layout can allocate indices.
+_LAYOUT_LOCK = threading.RLock()
+
+# The names of every attribute watched by any versioned property, so that the 
+# hooks can quickly ignore changes to any other attribute.
+_VERSIONED_ATTRS = set()
+
+class _Flight:
+    """
+    A value being computed by one thread, on behalf of any others that need it
+    at the same time.
+    """
+    __slots__ = 'owner', 'done', 'value', 'error'
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.done = None
+        self.value = None
+        self.error = None
+
+def _make_single_flight(getter):
+    # Wrap the getter so that, for each object, only one thread at a time
+    # calls it.  Any other threads that call the wrapper in the meantime wait
+    # for that call to finish, and share its result or exception.  The lock
+    # that they wait on is only allocated when there actually is a waiter, so
+    # a call without contention just adds and removes an entry in the table of
+    # calls in progress.  Objects are identified by `id`, because they must be
+    # alive while their values are being computed.
+    flights = {}
+    guard = threading.Lock()
+    get_ident = threading.get_ident
+
+    @wraps(getter)
+    def single_flight(obj):
+        key = id(obj)
+
+        with guard:
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = _Flight(get_ident())
+                leader = True
+            elif flight.owner == get_ident():
+                # The getter is recursive, so waiting would deadlock.
+                leader = None
+            else:
+                leader = False
+                if flight.done is None:
+                    flight.done = threading.Lock()
+                    flight.done.acquire()
+
+        if leader is None:
+            return getter(obj)
+
+        if not leader:
+            with flight.done:
+                pass
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = getter(obj)
+        except BaseException as err:
+            flight.error = err
+            raise
+        finally:
+            # After the flight is removed from the table, no more threads can
+            # start waiting for it.
+            with guard:
+                del flights[key]
+            if flight.done is not None:
+                flight.done.release()
+
+        return flight.value
+
+    return single_flight
+
+_SINGLE_FLIGHT_CODE = _make_single_flight(lambda obj: None).__code__
+
+class CachedAwaitable:
+    """
+    The value cached for a property with an ``async`` getter.
+
+    The getter isn't called until the value is first awaited.  It then runs 
+    in its own task, which is shared by every awaiter.  Once the getter 
+    returns, awaiting the value again gives the same result without 
+    suspending.  If the getter raises, the exception is passed to every 
+    awaiter and the value is removed from the cache, so that the next access 
+    calls the getter again.  Cancelling one awaiter doesn't cancel the getter 
+    for the others.
+    """
+    __slots__ = 'getter', 'obj', 'name', 'task', 'result'
+
+    def __init__(self, getter, obj, name):
+        self.getter = getter
+        self.obj = obj
+        self.name = name
+        self.task = None
+        self.result = _EMPTY
+
+    @classmethod
+    def resolved(cls, value):
+        """
+        Make an awaitable that immediately gives the given value.
+        """
+        awaitable = cls(None, None, None)
+        awaitable.result = value
+        return awaitable
+
+    def __repr__(self):
+        if self.result is not _EMPTY:
+            return f'<{type(self).__name__} result={self.result!r}>'
         else:
-            is_fresh = prev_memo is _SET_BY_USER or \
-                    manager.is_fresh(prev_memo, curr_memo)
+            return f'<{type(self).__name__} pending>'
+
+    def __await__(self):
+        result = self.result
+        if result is not _EMPTY:
+            return result
+
+        import asyncio
+
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.getter(self.obj))
+            self.task.add_done_callback(self._finish)
+
+        return (yield from asyncio.shield(self.task).__await__())
+
+    def _finish(self, task):
+        if task.cancelled() or task.exception() is not None:
+            _forget_awaitable(self.obj, self.name, self)
+        else:
+            self.result = task.result()
+
+        # Don't keep the object alive; a cached value that refers back to its 
+        # object would otherwise keep it alive when using `WeakStorage`.
+        self.getter = self.obj = None
+
+def _make_async_getter(getter, name):
+    # Wrap an `async` getter so that the property caches an awaitable that 
+    # can be awaited any number of times, rather than a coroutine that can 
+    # only be awaited once.
+    @wraps(getter)
+    def async_getter(obj):
+        return CachedAwaitable(getter, obj, name)
+
+    return async_getter
 
-        if is_fresh:
-            # Assume that a `memos` entry implies a `values` entry.
-            return cache.values[attr]
+_ASYNC_GETTER_CODE = _make_async_getter(None, '').__code__
 
-        value = super().__get__(obj, owner)
-        cache.values[attr] = value
-        cache.memos[attr] = curr_memo
+def _note_getter(layout, name, getter):
+    # Remember which properties cache awaitables or futures, so that 
+    # `set_cached_attr()` can wrap plain values for them, and so that pending 
+    # futures can be cancelled when they're removed from the cache.
+    code = getattr(getter, '__code__', None)
+
+    if code is _ASYNC_GETTER_CODE:
+        layout.wrappers[name] = _as_awaitable
+    elif code is _FUTURE_GETTER_CODE:
+        layout.wrappers[name] = _as_future
+    else:
+        layout.wrappers.pop(name, None)
+
+def _as_awaitable(value):
+    if type(value) is CachedAwaitable:
         return value
+    return CachedAwaitable.resolved(value)
+
+def _forget_awaitable(obj, name, awaitable):
+    # Only remove the awaitable if it hasn't already been replaced.  Values 
+    # cached by the `overwrite` policy are in the instance dictionary.
+    if get_cached_attr(obj, name, None) is awaitable:
+        del_cached_attr(obj, name)
+        return
+
+    instance_dict = getattr(obj, '__dict__', {})
+    if instance_dict.get(name) is awaitable:
+        del instance_dict[name]
+
+_DEFAULT_EXECUTOR = None
+
+def _make_future_getter(getter, name, executor):
+    # Wrap a getter so that it's called by an executor, and so that the 
+    # property caches the resulting future.  The future is submitted and 
+    # cached while holding the lock used to write to the object's cache, so 
+    # that only one future is submitted even if several threads miss at once.  
+    # Submitting a future is fast, so the lock is only held briefly.
+    @wraps(getter)
+    def future_getter(obj):
+        lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+        lock.acquire()
+        try:
+            future = get_cached_attr(obj, name, None)
+            if future is None:
+                future = (executor or _get_default_executor()).submit(getter, obj)
+                set_cached_attr(obj, name, future)
+            return future
+        finally:
+            lock.release()
+
+    return future_getter
+
+_FUTURE_GETTER_CODE = _make_future_getter(None, '', None).__code__
+
+def _get_default_executor():
+    # The thread pool is only created when it's first needed, because 
+    # `concurrent.futures` is slow to import.
+    global _DEFAULT_EXECUTOR
+
+    if _DEFAULT_EXECUTOR is None:
+        with _LAYOUT_LOCK:
+            if _DEFAULT_EXECUTOR is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _DEFAULT_EXECUTOR = ThreadPoolExecutor(
+                        thread_name_prefix='autoprop',
+                )
+
+    return _DEFAULT_EXECUTOR
+
+def _as_future(value):
+    from concurrent.futures import Future
+
+    if isinstance(value, Future):
+        return value
+
+    future = Future()
+    future.set_result(value)
+    return future
+
+# A cached property that stores its value in a slot of the instance, rather 
+# than in the record.  These properties are made by `_make_slot_property()`.  
+# Each one gets its own subclass, with a `__get__()` method that refers to the 
+# slot by name.  Reading a slot this way is as fast as reading any other 
+# attribute, and about twice as fast as going through the slot's member 
+# descriptor.  Values are written through the member descriptor, so that any 
+# custom `__setattr__()` is bypassed.  (This is a comment rather than a 
+# docstring, because `__doc__` is a slot.)
+
+class SlotCachedProperty(property):
+    __slots__ = 'name', 'member', 'memo_member', '__doc__'
+    value_slot = None
+    memo_slot = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.member = _find_member(owner, self.value_slot)
+        self.memo_member = self.memo_slot and _find_member(owner, self.memo_slot)
+
+        layout = _get_layout(owner)
+        layout.slots[name] = self.member, self.memo_member
+        _note_getter(layout, name, self.fget)
+
+def _get_slot_cached(self, obj, owner=None):
+    try:
+        return obj._VALUE_SLOT
+    except AttributeError:
+        pass
+
+    # Class attribute access (e.g. for docstrings): 
+    if obj is None:
+        return self
+
+    value = property.__get__(self, obj, owner)
+    self.member.__set__(obj, value)
+    return value
+
+def _get_slot_conditional(self, obj, owner=None):
+    if obj is None:
+        return self
+
+    curr_memo = self.refresh(obj)
+
+    # The value may have been deleted since the memo was read.
+    try:
+        prev_memo = obj._MEMO_SLOT
+        if prev_memo == curr_memo or prev_memo is _SET_BY_USER:
+            return obj._VALUE_SLOT
+    except AttributeError:
+        pass
+
+    value = property.__get__(self, obj, owner)
+
+    lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+    lock.acquire()
+    try:
+        self.member.__set__(obj, value)
+        self.memo_member.__set__(obj, curr_memo)
+    finally:
+        lock.release()
+
+    return value
+
+def _set_slot_overwrite(self, obj, value):
+    self.member.__set__(obj, value)
+
+def _delete_slot_overwrite(self, obj):
+    self.member.__delete__(obj)
+
+def _make_slot_property(prop, name):
+    """
+    Make a copy of the given cached property that stores its value in slots.
+
+    Returns the new property and the names of the slots it needs.  The 
+    property must be assigned to a class that has those slots (or inherits 
+    them).  Any of the properties made by the ``overwrite``, ``manual``, 
+    ``automatic``, and ``immutable`` policies can be copied.
+    """
+    value_slot = f'_autoprop_value_{name}'
+    memo_slot = None
+    methods = {}
+
+    if isinstance(prop, ConditionalCachedProperty):
+        memo_slot = f'_autoprop_memo_{name}'
+        methods['__get__'] = _get_slot_conditional
+        args = prop.fget, prop.fset, prop.fdel
+        attrs = {'refresh': prop.refresh, 'memo_manager': prop.memo_manager}
+
+    elif isinstance(prop, CachedProperty):
+        methods['__get__'] = _get_slot_cached
+        args = prop.fget, prop.fset, prop.fdel
+        attrs = {}
+
+    elif isinstance(prop, OverwriteCachedProperty):
+        if prop.lock:
+            raise ValueError(f"can't store {name!r} in slots; the overwrite policy only supports locking when values are stored in the instance dictionary")
+
+        methods['__get__'] = _get_slot_cached
+        methods['__set__'] = _set_slot_overwrite
+        methods['__delete__'] = _delete_slot_overwrite
+        args = prop.func, None, None
+        attrs = {}
+
+    else:
+        raise TypeError(f"can't store {prop!r} in slots")
+
+    names = {'_VALUE_SLOT': value_slot, '_MEMO_SLOT': memo_slot or '_'}
+    ns = {k: _rename_globals(f, names) for k, f in methods.items()}
+    ns.update(
+            __slots__=tuple(attrs),
+            __doc__=SlotCachedProperty.__dict__['__doc__'],
+            __qualname__=f'SlotCachedProperty[{name}]',
+            value_slot=value_slot,
+            memo_slot=memo_slot,
+    )
+
+    cls = type('SlotCachedProperty', (SlotCachedProperty,), ns)
+    slot_prop = cls(*args)
+    slot_prop.__doc__ = prop.__doc__
+
+    for k, v in attrs.items():
+        setattr(slot_prop, k, v)
+
+    return slot_prop, [x for x in (value_slot, memo_slot) if x]
+
+def _rename_globals(f, names):
+    # Replace placeholder attribute names with real ones, without having to 
+    # compile anything.
+    code = f.__code__
+    co_names = tuple(names.get(x, x) for x in code.co_names)
+
+    if sys.version_info >= (3, 8):
+        code = code.replace(co_names=co_names)
+    else:
+        code = CodeType(
+                code.co_argcount, code.co_kwonlyargcount, code.co_nlocals,
+                code.co_stacksize, code.co_flags, code.co_code,
+                code.co_consts, co_names, code.co_varnames,
+                code.co_filename, code.co_name, code.co_firstlineno,
+                code.co_lnotab, code.co_freevars, code.co_cellvars,
+        )
+
+    return FunctionType(code, f.__globals__, f.__name__, f.__defaults__)
+
+def _find_member(owner, slot):
+    for base in owner.__mro__:
+        if slot in base.__dict__:
+            return base.__dict__[slot]
+
+    raise TypeError(f"{owner.__qualname__} doesn't have a slot named {slot!r}")
+
+def _read_slot(member, obj):
+    try:
+        return member.__get__(obj)
+    except AttributeError:
+        return _EMPTY
+
+class Storage:
+    """
+    Decide where the cached values for a class are kept.
+
+    The storage for a class can be chosen using the *storage* argument to 
+    :deco:`autoprop.cache`, and is inherited by subclasses.  To keep cached 
+    values somewhere new, subclass this class and implement all of its 
+    methods.  The cached properties, and functions like 
+    :func:`get_cached_attr` and :func:`clear_cache`, will then read and write 
+    values using those methods.
+
+    The built-in storages all keep an object's values in a list, and their 
+    cached properties read that list directly rather than calling these 
+    methods, which is significantly faster.
+
+    The ``automatic`` policy also needs to store a "memo" alongside each 
+    value, which it uses to decide when the value needs to be recalculated.  
+    Memos are opaque, and are always stored together with their values.
+
+    These methods may be called by several threads at once, so storages that 
+    are shared between threads must be thread-safe.  In particular, a value 
+    and its memo must be replaced together.
+    """
+    __slots__ = ()
+
+    def get(self, obj, name):
+        """
+        Return the cached value of the given attribute, or raise 
+        :exc:`KeyError` if there isn't one.
+        """
+        raise NotImplementedError
+
+    def set(self, obj, name, value, memo=None):
+        """
+        Cache a new value for the given attribute.
+
+        The memo is None for properties that don't use memos.  Storages don't 
+        need to keep such memos, but must forget any previous memo.
+        """
+        raise NotImplementedError
+
+    def delete(self, obj, name):
+        """
+        Remove the cached value (and memo) of the given attribute, or raise 
+        :exc:`KeyError` if there isn't one.
+        """
+        raise NotImplementedError
+
+    def get_memo(self, obj, name):
+        """
+        Return the memo of the given attribute, or raise :exc:`KeyError` if 
+        there isn't one.
+        """
+        raise NotImplementedError
+
+    def clear(self, obj):
+        """
+        Remove every cached value (and memo) of the given object.
+        """
+        raise NotImplementedError
+
+    def items(self, obj):
+        """
+        Iterate over the ``(name, value)`` pairs cached by the given object.
+        """
+        raise NotImplementedError
+
+class DictStorage(Storage):
+    """
+    Keep cached values in a list stored in the instance dictionary.
+
+    This is the default for classes that have instance dictionaries.
+    """
+    __slots__ = ()
+
+    def get(self, obj, name):
+        return self._get(obj, name, _get_layout(type(obj)).values)
+
+    def set(self, obj, name, value, memo=None):
+        layout = _get_layout(type(obj))
+        index = layout.index(name)
+        memo_index = layout.memos.get(name)
+
+        # Don't make room for memos that no property will ever read.
+        if memo_index is None and memo is not None and memo is not _SET_BY_USER:
+            memo_index = layout.memo_index(name)
+
+        record = _get_record(obj, layout)
+
+        if memo_index is None:
+            record[index] = value
+            return
+
+        lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+        lock.acquire()
+        try:
+            record[index] = value
+            record[memo_index] = _EMPTY if memo is None else memo
+        finally:
+            lock.release()
+
+    def delete(self, obj, name):
+        layout = _get_layout(type(obj))
+        index = layout.values.get(name)
+        if index is None:
+            raise KeyError(name)
+
+        record = _get_record(obj, layout)
+        if record[index] is _EMPTY:
+            raise KeyError(name)
+
+        memo_index = layout.memos.get(name)
+        if memo_index is None:
+            record[index] = _EMPTY
+            return
+
+        # Erase the memo before the value, so that a memo always implies a 
+        # value (see `_get_conditional()`).
+        lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+        lock.acquire()
+        try:
+            record[memo_index] = _EMPTY
+            record[index] = _EMPTY
+        finally:
+            lock.release()
+
+    def get_memo(self, obj, name):
+        return self._get(obj, name, _get_layout(type(obj)).memos)
+
+    def clear(self, obj):
+        try:
+            object.__delattr__(obj, _CACHE_ATTR)
+        except AttributeError:
+            pass
+
+    def items(self, obj):
+        record = getattr(obj, _CACHE_ATTR, None)
+        if record is None:
+            return
+
+        for name, index in _get_layout(type(obj)).values.items():
+            if index < len(record) and record[index] is not _EMPTY:
+                yield name, record[index]
+
+    def _get(self, obj, name, indices):
+        index = indices.get(name)
+        if index is not None:
+            value = _get_record(obj, _get_layout(type(obj)))[index]
+            if value is not _EMPTY:
+                return value
+
+        raise KeyError(name)
+
+class SlotStorage(DictStorage):
+    """
+    Keep cached values in hidden slots.
+
+    This is the default for classes that don't have instance dictionaries.  
+    Slots can't be added to a class after it's created, so the decorator 
+    returns a copy of the class with the necessary slots.  Any cached values 
+    that don't have slots, e.g. those of properties inherited from 
+    superclasses that don't use this storage, are kept in the instance 
+    dictionary.
+    """
+    __slots__ = ()
+
+    def get(self, obj, name):
+        members = _get_layout(type(obj)).slots.get(name)
+        if members is None:
+            return super().get(obj, name)
+
+        value = _read_slot(members[0], obj)
+        if value is _EMPTY:
+            raise KeyError(name)
+
+        return value
+
+    def set(self, obj, name, value, memo=None):
+        members = _get_layout(type(obj)).slots.get(name)
+        if members is None:
+            return super().set(obj, name, value, memo)
+
+        member, memo_member = members
+
+        if not memo_member:
+            member.__set__(obj, value)
+            return
+
+        lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+        lock.acquire()
+        try:
+            member.__set__(obj, value)
+
+            if memo is None:
+                if _read_slot(memo_member, obj) is not _EMPTY:
+                    memo_member.__delete__(obj)
+            else:
+                memo_member.__set__(obj, memo)
+        finally:
+            lock.release()
+
+    def delete(self, obj, name):
+        members = _get_layout(type(obj)).slots.get(name)
+        if members is None:
+            return super().delete(obj, name)
+
+        member, memo_member = members
+        if _read_slot(member, obj) is _EMPTY:
+            raise KeyError(name)
+
+        if not memo_member:
+            member.__delete__(obj)
+            return
+
+        # Erase the memo before the value, as in `DictStorage.delete()`.
+        lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+        lock.acquire()
+        try:
+            if _read_slot(memo_member, obj) is not _EMPTY:
+                memo_member.__delete__(obj)
+            member.__delete__(obj)
+        except AttributeError:
+            # Another thread deleted the value first.
+            pass
+        finally:
+            lock.release()
+
+    def get_memo(self, obj, name):
+        members = _get_layout(type(obj)).slots.get(name)
+        if members is None:
+            return super().get_memo(obj, name)
+
+        memo = _read_slot(members[1], obj) if members[1] else _EMPTY
+        if memo is _EMPTY:
+            raise KeyError(name)
+
+        return memo
+
+    def clear(self, obj):
+        for members in _get_layout(type(obj)).slots.values():
+            for member in members:
+                if member is not None and _read_slot(member, obj) is not _EMPTY:
+                    member.__delete__(obj)
+
+        super().clear(obj)
+
+    def items(self, obj):
+        yield from super().items(obj)
+
+        for name, (member, _) in _get_layout(type(obj)).slots.items():
+            value = _read_slot(member, obj)
+            if value is not _EMPTY:
+                yield name, value
+
+class WeakStorage(DictStorage):
+    """
+    Keep cached values in a table on the side, rather than in the objects 
+    themselves.
+
+    This is meant for objects that can't store the cache themselves, e.g. 
+    because they don't have instance dictionaries and can't be given slots.  
+    The objects must support weak references, which are used to remove their 
+    values from the table when they are garbage collected.  Note that a cached 
+    value that refers back to its own object will keep that object alive.
+
+    The table is keyed by `id`, because the objects might not be hashable, or 
+    might compare equal to each other.  This storage is also a descriptor that 
+    gets installed on the class in place of the cache attribute, so that 
+    ``obj.__autoprop_cache`` finds the list of values in the table and 
+    everything else works as it does for :class:`DictStorage`.
+    """
+    __slots__ = 'records', 'refs'
+
+    def __init__(self):
+        self.records = {}
+        self.refs = {}
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return self.records[id(obj)]
+        except KeyError:
+            raise AttributeError(_CACHE_ATTR) from None
+
+    def __set__(self, obj, record):
+        key = id(obj)
+
+        if key not in self.refs:
+            try:
+                self.refs[key] = weakref.ref(obj, partial(self._forget, key))
+            except TypeError:
+                raise TypeError(f"can't cache values for {type(obj).__qualname__} objects; they don't support weak references") from None
+
+        self.records[key] = record
+
+    def __delete__(self, obj):
+        try:
+            del self.records[id(obj)]
+        except KeyError:
+            raise AttributeError(_CACHE_ATTR) from None
+
+    def _forget(self, key, ref):
+        self.records.pop(key, None)
+        self.refs.pop(key, None)
+
+_STORAGES = {
+        'dict': DictStorage,
+        'slots': SlotStorage,
+        'weak': WeakStorage,
+}
+_DEFAULT_STORAGE = DictStorage()
+
+def _make_storage(storage):
+    if storage is None or isinstance(storage, Storage):
+        return storage
+
+    try:
+        return _STORAGES[storage]()
+    except (KeyError, TypeError):
+        expected = ', '.join(repr(k) for k in _STORAGES)
+        raise ValueError(f"unknown storage {storage!r}, expected a Storage or one of: {expected}") from None
+
+def _get_storage(cls):
+    return _get_layout(cls).storage
+
+def _install_storage(cls, storage):
+    setattr(cls, _STORAGE_ATTR, storage)
+    _get_layout(cls).storage = storage
+
+    # The built-in properties always look for the record in the cache 
+    # attribute, so that's where the side table needs to be.
+    if isinstance(storage, WeakStorage):
+        setattr(cls, _CACHE_ATTR, storage)
+
+def _uninstall_storage(cls):
+    storage = cls.__dict__.get(_STORAGE_ATTR)
+    if storage is None:
+        return
+
+    delattr(cls, _STORAGE_ATTR)
+    if cls.__dict__.get(_CACHE_ATTR) is storage:
+        delattr(cls, _CACHE_ATTR)
+
+    _get_layout(cls).storage = getattr(cls, _STORAGE_ATTR, _DEFAULT_STORAGE)
+
+# A cached property that reads and writes its value through the methods of a 
+# custom storage.  These properties are made by `_make_stored_property()`.
+
+def _get_stored(self, obj, owner=None):
+    if obj is None:
+        return self
+
+    try:
+        return self.storage.get(obj, self.name)
+    except KeyError:
+        pass
+
+    value = property.__get__(self, obj, owner)
+    self.storage.set(obj, self.name, value)
+    return value
+
+def _get_stored_conditional(self, obj, owner=None):
+    if obj is None:
+        return self
+
+    storage = self.storage
+    curr_memo = self.refresh(obj)
+
+    try:
+        prev_memo = storage.get_memo(obj, self.name)
+        if prev_memo == curr_memo or prev_memo is _SET_BY_USER:
+            return storage.get(obj, self.name)
+
+    # Another thread may delete the value between reading the memo and 
+    # reading the value itself.
+    except KeyError:
+        pass
+
+    value = property.__get__(self, obj, owner)
+    storage.set(obj, self.name, value, curr_memo)
+    return value
+
+class StoredCachedProperty(property):
+    __slots__ = 'name', 'storage', '__doc__'
+    __get__ = _get_stored
+
+    def __init__(self, getter, setter, deleter, storage):
+        super().__init__(getter, setter, deleter)
+        self.storage = storage
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        _note_getter(_get_layout(owner), name, self.fget)
+
+class StoredConditionalCachedProperty(property):
+    __slots__ = 'name', 'storage', 'memo_manager', 'refresh', '__doc__'
+    __get__ = _get_stored_conditional
+
+    def __init__(self, getter, setter, deleter, memo_manager, storage):
+        super().__init__(getter, setter, deleter)
+        self.storage = storage
+        self.memo_manager = memo_manager
+        self.refresh = memo_manager.refresh
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        _note_getter(_get_layout(owner), name, self.fget)
+
+_CACHED_PROPERTIES = (
+        CachedProperty,
+        ConditionalCachedProperty,
+        TrackedCachedProperty,
+        OverwriteCachedProperty,
+        SlotCachedProperty,
+        StoredCachedProperty,
+        StoredConditionalCachedProperty,
+)
+
+def _make_stored_property(prop, storage):
+    """
+    Make a copy of the given ``manual``, ``automatic``, or ``immutable`` 
+    property that accesses its value through the given storage.
+    """
+    args = prop.fget, prop.fset, prop.fdel
+
+    if isinstance(prop, ConditionalCachedProperty):
+        stored = StoredConditionalCachedProperty(*args, prop.memo_manager, storage)
+    else:
+        stored = StoredCachedProperty(*args, storage)
+
+    stored.__doc__ = prop.__doc__
+    return stored
 
 def get_cache(obj):
+    """
+    Return the list that holds the cached values of the given object.
+
+    The list is created if the object doesn't have one yet.  Empty slots hold 
+    a placeholder object.  This is mostly useful for debugging; use 
+    :func:`get_cached_attr` to look up values by name.
+    """
+    return _get_record(obj, _get_layout(type(obj)))
+
+def _get_record(obj, layout):
     try:
-        return getattr(obj, _CACHE_ATTR)
+        record = obj.__autoprop_cache
     except AttributeError:
-        cache = Cache(obj)
-        setattr(obj, _CACHE_ATTR, cache)
-        return cache
+        record = _add_record(obj, layout)
+
+    # The layout may have grown since the record was made.
+    if len(record) < layout.size:
+        record += [_EMPTY] * (layout.size - len(record))
+
+    return record
+
+def _add_record(obj, layout):
+    if layout.conflicts:
+        _resolve_conflicts(type(obj), layout)
+
+    record = [_EMPTY] * layout.size
+
+    # Another thread might be making a record for the same object at the same 
+    # time.  Whichever record is added first must be used by both threads, or 
+    # else the values stored in the other would be lost.  (Using 
+    # `obj.__dict__.setdefault()` would avoid the lock, but accessing 
+    # `__dict__` makes every other attribute access on the object slower.)
+    lock = _WRITE_LOCKS[id(obj) >> 4 & _WRITE_LOCK_MASK]
+    lock.acquire()
+    try:
+        prev_record = getattr(obj, _CACHE_ATTR, None)
+        if prev_record is not None:
+            return prev_record
+
+        # Bypass any custom `__setattr__()`, e.g. for frozen dataclasses.  
+        # The cache isn't part of the object's public state.
+        try:
+            object.__setattr__(obj, _CACHE_ATTR, record)
+        except AttributeError:
+            raise _no_storage_error(obj) from None
+
+        return record
+    finally:
+        lock.release()
+
+def _no_storage_error(obj):
+    # This happens if a decorator like `@dataclass(slots=True)` or 
+    # `@attrs.define` rebuilds the class after autoprop was applied.
+    return TypeError(f"can't cache values for {type(obj).__qualname__} objects; they have neither an instance dictionary nor cache slots (apply autoprop above any decorator that adds `__slots__`)")
+
+def _get_layout(cls):
+    try:
+        return cls.__dict__[_LAYOUT_ATTR]
+    except KeyError:
+        pass
+
+    # Only one layout can be made for each class, even if several threads 
+    # need it at the same time.
+    with _LAYOUT_LOCK:
+        try:
+            return cls.__dict__[_LAYOUT_ATTR]
+        except KeyError:
+            pass
+
+        bases = [
+                _get_layout(base)
+                for base in cls.__bases__
+                if hasattr(base, _LAYOUT_ATTR)
+        ]
+        layout = Layout(bases)
+        setattr(cls, _LAYOUT_ATTR, layout)
+        return layout
+
+def _find_layout(cls):
+    # Classes that have never been decorated (and never had values set with 
+    # `set_cached_attr()`) can't have anything cached, and may not even allow 
+    # a layout to be added (e.g. built-in types).
+    try:
+        return cls.__dict__[_LAYOUT_ATTR]
+    except KeyError:
+        pass
+
+    if hasattr(cls, _LAYOUT_ATTR):
+        return _get_layout(cls)
+
+    return None
+
+def _update_derived_layouts(cls):
+    # Subclasses that already have layouts don't know about any properties 
+    # that were just added to this class.  Copy any that end up with different 
+    # indices right away, rather than when the next record is made, because 
+    # the subclasses may already have instances with records.
+    for subcls in cls.__subclasses__():
+        layout = subcls.__dict__.get(_LAYOUT_ATTR)
+        if layout is None:
+            continue
+
+        with _LAYOUT_LOCK:
+            layout.update([
+                _get_layout(base)
+                for base in subcls.__bases__
+                if hasattr(base, _LAYOUT_ATTR)
+            ])
+
+        if layout.conflicts:
+            _resolve_conflicts(subcls, layout)
+
+        _update_derived_layouts(subcls)
+
+def _resolve_conflicts(cls, layout):
+    # Properties inherited from secondary bases may expect different indices 
+    # than this class assigns them.  Give this class its own copies of such 
+    # properties, with the right indices.
+
+    for name in layout.conflicts:
+        for base in cls.__mro__:
+            if name in base.__dict__:
+                prop = base.__dict__[name]
+                break
+        else:
+            continue
+
+        if base is not cls and isinstance(
+                prop, (
+                    CachedProperty,
+                    ConditionalCachedProperty,
+                    TrackedCachedProperty,
+                )):
+            prop = prop._copy()
+            prop.__set_name__(cls, name)
+            setattr(cls, name, prop)
+
+    layout.conflicts = set()
 
 def get_cached_attr(obj, attr, default=_UNSPECIFIED):
     """
@@ -99,32 +1727,66 @@ def get_cached_attr(obj, attr, default=_UNSPECIFIED):
     If the given object didn't have a cache, this will initialize and empty one.
     Only the 
     """
-    cache = get_cache(obj)
-    try:
-        return cache.values[attr]
-    except KeyError as err:
-        if default is not _UNSPECIFIED:
-            return default
-        else:
-            raise AttributeError(err) from None
+    layout = _find_layout(type(obj))
+
+    if layout is not None:
+        try:
+            return layout.storage.get(obj, attr)
+        except KeyError:
+            pass
+
+    if default is not _UNSPECIFIED:
+        return default
+
+    raise AttributeError(repr(attr))
 
 def set_cached_attr(obj, attr, value):
-    cache = get_cache(obj)
-    cache.values[attr] = value
-    cache.memos[attr] = _SET_BY_USER
+    layout = _get_layout(type(obj))
+
+    if layout.wrappers and attr in layout.wrappers:
+        value = layout.wrappers[attr](value)
+
+    layout.storage.set(obj, attr, value, _SET_BY_USER)
+
+    # Versioned properties that depend on this one need to be recalculated.
+    if attr in _VERSIONED_ATTRS:
+        _bump_versions(obj, attr)
 
 def del_cached_attr(obj, attr):
-    cache = get_cache(obj)
+    layout = _find_layout(type(obj))
+    if layout is None:
+        raise AttributeError(repr(attr))
 
-    try:
-        del cache.values[attr]
-    except KeyError as err:
-        raise AttributeError(err) from None
+    storage = layout.storage
+
+    future = None
+    if layout.wrappers.get(attr) is _as_future:
+        future = get_cached_attr(obj, attr, None)
 
     try:
-        del cache.memos[attr]
+        storage.delete(obj, attr)
     except KeyError:
-        pass
+        raise AttributeError(repr(attr)) from None
+
+    # Cancel the future after removing it, so that nothing else can get it 
+    # from the cache in the meantime.  If it's already running, it can't be 
+    # cancelled, but its result will be discarded.
+    if future is not None:
+        future.cancel()
+
+    if attr in _VERSIONED_ATTRS:
+        _bump_versions(obj, attr)
+
+def _invalidate(obj, names):
+    # Drop the cached values of the given properties, if they have any.  
+    # Values cached by the `overwrite` policy are kept in the instance 
+    # dictionary, rather than in the cache.
+    for name in names:
+        try:
+            del_cached_attr(obj, name)
+        except AttributeError:
+            if isinstance(_lookup_static(type(obj), name), OverwriteCachedProperty):
+                getattr(obj, '__dict__', {}).pop(name, None)
 
 def clear_cache(obj):
     """
@@ -135,14 +1797,32 @@ def clear_cache(obj):
         Only the ``manual``, ``automatic``, and ``immutable`` cache policies 
         will be affected by this operation.  The ``overwrite`` policy caches 
         values directly in the instance dictionary, and so will not be 
-        affected.
+        affected.  The exception is classes that store their cache in slots, 
+        where every policy is affected.
 
     This will force any values stored in the cache to be recalculated the next 
-    time they are needed.
+    time they are needed.  Any futures cached by the ``future`` policy that 
+    haven't started running yet are cancelled.
     """
-    try:
-        delattr(obj, _CACHE_ATTR)
-    except AttributeError:
-        pass
+    layout = _find_layout(type(obj))
+
+    if layout is None:
+        return
+
+    if layout.wrappers and _as_future in layout.wrappers.values():
+        _clear_futures(obj, layout)
+    else:
+        layout.storage.clear(obj)
 
+def _clear_futures(obj, layout):
+    # Cancel the futures after clearing the cache, for the same reason as in 
+    # `del_cached_attr()`.
+    storage = layout.storage
+    futures = [
+            v for k, v in storage.items(obj)
+            if layout.wrappers.get(k) is _as_future
+    ]
+    storage.clear(obj)
 
+    for future in futures:
+        future.cancel()
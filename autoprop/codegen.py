@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+
+"""
+Generate explicit source code for the properties that autoprop would create.
+
+Usage:
+    python -m autoprop.codegen <module:Class> [--verify]
+
+The given class must be importable, and must be decorated by autoprop (or
+inherit from :class:`autoprop.Autoprop`).  The generated code should be pasted
+at the end of the body of the class, and then the decorator should be
+removed.  The class will then be exactly the same as it was before, but
+importing it will not require analyzing any accessors at runtime.
+
+The generated code records which decorator it replaced.  With ``--verify``,
+the given class is expected to contain generated code instead of a decorator.
+The class is compared to what that decorator would produce, and any
+differences (e.g. from accessors that were added or renamed after the code was
+generated) are reported.
+
+This module also provides the helpers that the generated code uses.  These
+helpers aren't meant to be used directly.
+"""
+
+import autoprop
+import functools
+import sys
+
+from .cache import (
+        CachedProperty, ConditionalCachedProperty, OverwriteCachedProperty,
+        SlotStorage,
+        _make_single_flight, _make_async_getter, _make_future_getter,
+        _SINGLE_FLIGHT_CODE, _ASYNC_GETTER_CODE, _FUTURE_GETTER_CODE,
+        _LAYOUT_ATTR, _STORAGE_ATTR,
+)
+from .policies import (
+        AutomaticPolicy, OverwritePolicy, FuturePolicy, ProvideMutatorsMixin,
+        SingleFlightMixin, _mark_dynamic, _is_infer,
+        _make_default_setter, _make_default_deleter, _make_invalidating,
+        _INVALIDATING_CODE,
+)
+from .decorators import (
+        _wrap_getter, _count_params, _resolve_lazy_autoprops,
+        _MANIFEST_ATTR, _WRAPPER_ATTR,
+)
+from types import MemberDescriptorType
+
+# Code generated by previous versions of autoprop uses `cached_property` for 
+# the `overwrite` policy.
+if sys.version_info >= (3, 8):
+    from functools import cached_property
+else:
+    from backports.cached_property import cached_property
+
+_RECORD_ATTR = '__autoprop_codegen__'
+_DEFAULT_SETTER_CODE = _make_default_setter('').__code__
+_DEFAULT_DELETER_CODE = _make_default_deleter('').__code__
+
+# Helpers used by the generated code:
+
+default_setter = _make_default_setter
+default_deleter = _make_default_deleter
+mark_dynamic = _mark_dynamic
+single_flight = _make_single_flight
+async_getter = _make_async_getter
+wrap_getter = _wrap_getter
+invalidating = _make_invalidating
+
+def future_getter(getter, name):
+    return _make_future_getter(getter, name, None)
+
+def memo_manager(watch):
+    return AutomaticPolicy.MemoManager(watch)
+
+def getter_wrapper(getter):
+
+    def decorator(wrapper):
+        functools.update_wrapper(wrapper, getter)
+        setattr(wrapper, _WRAPPER_ATTR, True)
+        return wrapper
+
+    return decorator
+
+def generate(cls, *, target=None):
+    """
+    Return source code for the properties that autoprop added to the given
+    class.
+
+    Arguments:
+        cls:
+            A class that was decorated by autoprop.
+
+        target:
+            The ``module:Class`` string used to find the class, for the
+            comment at the top of the generated code.
+
+    The code is indented to go inside the body of the class.  A `ValueError`
+    is raised if the properties can't be expressed as code, e.g. because an
+    ``automatic`` property watches a callable rather than an attribute name.
+    """
+    _resolve_lazy_autoprops(cls)
+
+    try:
+        manifest = cls.__dict__[_MANIFEST_ATTR]
+    except KeyError:
+        raise ValueError(f"{cls.__qualname__} is not decorated by autoprop") from None
+
+    storage = cls.__dict__.get(_STORAGE_ATTR)
+    if storage and not isinstance(storage, SlotStorage):
+        raise ValueError(f"can't generate code for {cls.__qualname__}; it uses {type(storage).__name__}")
+
+    target = target or f'{cls.__module__}:{cls.__qualname__}'
+    decorator = _policy_source(manifest.default_policy)
+    refs = _AccessorRefs(cls, manifest)
+    body = []
+
+    for name in manifest.generated:
+        attr = cls.__dict__[name]
+
+        if _is_getter_wrapper(attr):
+            body += _generate_getter_wrapper(name, attr, refs)
+        elif _is_invalidating(attr):
+            body += [f"{name} = {_mutator_ref(attr, None, None, name, refs)}"]
+        else:
+            body += _generate_prop(cls, name, attr, refs)
+
+    lines = [
+            f"# Generated by `python -m autoprop.codegen {target}`.",
+            f"# Regenerate rather than editing by hand.  Replaces: @{decorator}",
+            f"import autoprop.codegen as _autoprop",
+            *refs.imports,
+            *body,
+            f"{_RECORD_ATTR} = {(decorator, tuple(manifest.generated))!r}",
+            f"del {', '.join(['_autoprop', *refs.aliases])}",
+    ]
+    return ''.join(f'    {x}\n' for x in lines)
+
+def verify(cls):
+    """
+    Check that the given class, which should contain code generated by
+    :func:`generate`, matches what the original decorator would produce.
+
+    Returns a list of differences, which will be empty if the class is
+    correct.
+    """
+    try:
+        decorator, names = cls.__dict__[_RECORD_ATTR]
+    except KeyError:
+        return [f"{cls.__qualname__} doesn't contain any generated code"]
+
+    # Recreate the class as it would've been before the code was generated,
+    # then decorate it.
+
+    ns = dict(cls.__dict__)
+    for key in ['__dict__', '__weakref__', _RECORD_ATTR, _MANIFEST_ATTR, _LAYOUT_ATTR]:
+        ns.pop(key, None)
+
+    # The new class will make its own descriptors for any slots.
+    for key, attr in cls.__dict__.items():
+        if isinstance(attr, MemberDescriptorType) and attr.__objclass__ is cls:
+            del ns[key]
+
+    for name in names:
+        attr = ns.pop(name, None)
+        if _is_getter_wrapper(attr) or _is_invalidating(attr):
+            ns[name] = attr.__wrapped__
+
+    decorate = eval(decorator, {'autoprop': autoprop})
+    expected = decorate(type(cls)(cls.__name__, cls.__bases__, ns))
+    expected_names = expected.__dict__[_MANIFEST_ATTR].generated
+
+    problems = []
+
+    for name in expected_names:
+        if name not in names:
+            problems.append(f"{name}: missing from generated code")
+
+    for name in names:
+        if name not in expected_names:
+            problems.append(f"{name}: not expected in generated code")
+            continue
+
+        actual_desc = _describe(cls.__dict__.get(name))
+        expected_desc = _describe(expected.__dict__[name])
+
+        if actual_desc != expected_desc:
+            problems.append(f"{name}: expected {expected_desc}, got {actual_desc}")
+
+    return problems
+
+def main(argv=None):
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser(
+            prog='python -m autoprop.codegen',
+            description="Generate explicit source code for the properties that autoprop would create.",
+    )
+    parser.add_argument(
+            'target',
+            help="The class to generate code for, e.g. 'my_pkg.my_module:MyClass'.",
+    )
+    parser.add_argument(
+            '--verify', action='store_true',
+            help="Instead of generating code, check that the code already in the given class matches what autoprop would produce.",
+    )
+    args = parser.parse_args(argv)
+
+    module_name, _, qualname = args.target.partition(':')
+    if not qualname:
+        parser.error(f"expected 'module:Class', not {args.target!r}")
+
+    obj = importlib.import_module(module_name)
+    for name in qualname.split('.'):
+        obj = getattr(obj, name)
+
+    if args.verify:
+        problems = verify(obj)
+        for problem in problems:
+            print(f"{args.target}: {problem}")
+        return 1 if problems else 0
+
+    try:
+        print(generate(obj, target=args.target), end='')
+    except ValueError as err:
+        print(f"{args.target}: {err}", file=sys.stderr)
+        return 1
+
+    return 0
+
+class _AccessorRefs:
+    """
+    Work out how to refer to accessor functions from within the body of the
+    class being generated.
+    """
+
+    def __init__(self, cls, manifest):
+        self.cls = cls
+        self.manifest = manifest
+        self.imports = []
+        self.aliases = []
+        self._modules = {}
+
+    def __call__(self, f):
+        if f is None:
+            return 'None'
+
+        for name, (_, _, func) in self.manifest.accessors.items():
+            if func is f:
+                break
+        else:
+            raise ValueError(f"can't find accessor: {f.__qualname__}")
+
+        if name in self.manifest.own:
+            return name
+
+        for base in self.cls.__mro__[1:]:
+            if name in base.__dict__:
+                break
+
+        ref = f'{self._ref_class(base)}.{name}'
+        if base.__dict__[name] is not f:
+            ref += '.__wrapped__'
+
+        return ref
+
+    def _ref_class(self, base):
+        if '<locals>' in base.__qualname__:
+            raise ValueError(f"can't refer to locally defined class: {base.__qualname__}")
+
+        if base.__module__ == self.cls.__module__:
+            return base.__qualname__
+
+        try:
+            alias = self._modules[base.__module__]
+        except KeyError:
+            alias = self._modules[base.__module__] = f'_autoprop_{len(self._modules)}'
+            self.imports.append(f'import {base.__module__} as {alias}')
+            self.aliases.append(alias)
+
+        return f'{alias}.{base.__qualname__}'
+
+def _generate_prop(cls, name, prop, refs):
+    if type(prop) is OverwriteCachedProperty:
+        lock = ', lock=True' if prop.lock else ''
+        return [f"{name} = _autoprop.OverwriteCachedProperty({_getter_ref(prop.func, name, refs)}{lock})"]
+
+    if not isinstance(prop, property):
+        raise ValueError(f"can't generate code for {type(prop).__qualname__}: {cls.__qualname__}.{name}")
+
+    accessors = ', '.join([
+            _getter_ref(prop.fget, name, refs),
+            _mutator_ref(prop.fset, _DEFAULT_SETTER_CODE, 'default_setter', name, refs),
+            _mutator_ref(prop.fdel, _DEFAULT_DELETER_CODE, 'default_deleter', name, refs),
+    ])
+
+    if type(prop) is property:
+        lines = [f"{name} = property({accessors})"]
+        if prop.fget:
+            lines += [f"_autoprop.mark_dynamic({refs(prop.fget)})"]
+        return lines
+
+    if type(prop) is CachedProperty:
+        return [f"{name} = _autoprop.CachedProperty({accessors})"]
+
+    if type(prop) is ConditionalCachedProperty:
+        watch = _watch_source(prop.memo_manager.watch)
+        return [f"{name} = _autoprop.ConditionalCachedProperty({accessors}, _autoprop.memo_manager({watch}))"]
+
+    raise ValueError(f"can't generate code for {type(prop).__qualname__}: {cls.__qualname__}.{name}")
+
+def _generate_getter_wrapper(name, wrapper, refs):
+    getter = wrapper.__wrapped__
+    prop_name = _find_prop_name(refs.cls, wrapper)
+
+    if _count_params(getter) == 1:
+        return [
+                f"@_autoprop.getter_wrapper({refs(getter)})",
+                f"def {name}(self):",
+                f"    return self.{prop_name}",
+        ]
+    else:
+        return [f"{name} = _autoprop.wrap_getter({refs(getter)}, {prop_name!r})"]
+
+def _getter_ref(f, name, refs):
+    if _is_single_flight(f):
+        return f'_autoprop.single_flight({_getter_ref(f.__wrapped__, name, refs)})'
+    if _is_async_getter(f):
+        return f'_autoprop.async_getter({refs(f.__wrapped__)}, {name!r})'
+    if _is_future_getter(f):
+        cells = dict(zip(f.__code__.co_freevars, f.__closure__))
+        executor = cells['executor'].cell_contents
+        if executor is not None:
+            raise ValueError(f"can't generate code for executor: {executor!r}")
+        return f'_autoprop.future_getter({refs(f.__wrapped__)}, {name!r})'
+    return refs(f)
+
+def _mutator_ref(f, default_code, default_factory, name, refs):
+    if _is_invalidating(f):
+        mutator = _mutator_ref(f.__wrapped__, default_code, default_factory, name, refs)
+        return f'_autoprop.invalidating({mutator}, {_invalidated_names(f)!r})'
+    if f is not None and f.__code__ is default_code:
+        return f'_autoprop.{default_factory}({name!r})'
+    else:
+        return refs(f)
+
+def _find_prop_name(cls, wrapper):
+    getter = wrapper.__wrapped__
+
+    for name in cls.__dict__[_MANIFEST_ATTR].generated:
+        prop = cls.__dict__[name]
+        fget = getattr(prop, 'fget', None) or getattr(prop, 'func', None)
+        while _is_single_flight(fget) or _is_async_getter(fget) or _is_future_getter(fget):
+            fget = fget.__wrapped__
+        if fget is getter:
+            return name
+
+    raise ValueError(f"can't find property for getter: {getter.__qualname__}")
+
+def _policy_source(policy):
+    kwargs = {}
+
+    if isinstance(policy, ProvideMutatorsMixin):
+        if policy._provide_mutators is not None:
+            kwargs['provide_mutators'] = policy._provide_mutators
+
+    if isinstance(policy, SingleFlightMixin):
+        if policy._single_flight is not None:
+            kwargs['single_flight'] = policy._single_flight
+
+    if isinstance(policy, AutomaticPolicy):
+        kwargs['watch'] = _watch_source(policy._manager.watch)
+
+    if isinstance(policy, OverwritePolicy) and policy._lock:
+        kwargs['lock'] = True
+
+    if isinstance(policy, FuturePolicy) and policy._executor is not None:
+        raise ValueError(f"can't generate code for executor: {policy._executor!r}")
+
+    if policy.name == 'dynamic' and not kwargs:
+        return 'autoprop'
+
+    args = [f'policy={policy.name!r}']
+    args += [f'{k}={v!r}' if k != 'watch' else f'{k}={v}' for k, v in kwargs.items()]
+    return f"autoprop.cache({', '.join(args)})"
+
+def _watch_source(watch):
+    if _is_infer(watch):
+        return repr(watch)
+
+    watch = list(watch)
+    for w in watch:
+        if not isinstance(w, str):
+            raise ValueError(f"can't generate code for watched callable: {w!r}")
+    return repr(watch)
+
+def _describe(attr):
+    """
+    Summarize the given class attribute, in a way that's independent of the
+    exact function objects used to implement default mutators and getter
+    wrappers.
+    """
+    if _is_getter_wrapper(attr):
+        return 'getter wrapper', attr.__wrapped__, _count_params(attr.__wrapped__)
+
+    if _is_invalidating(attr):
+        return _describe_func(attr)
+
+    if isinstance(attr, OverwriteCachedProperty):
+        return type(attr).__name__, _describe_func(attr.func), attr.lock
+
+    if isinstance(attr, cached_property):
+        return type(attr).__name__, attr.func
+
+    if isinstance(attr, property):
+        desc = [
+                type(attr).__name__,
+                _describe_func(attr.fget),
+                _describe_func(attr.fset),
+                _describe_func(attr.fdel),
+        ]
+        if isinstance(attr, ConditionalCachedProperty):
+            desc.append(list(attr.memo_manager.watch))
+        return tuple(desc)
+
+    return type(attr).__name__
+
+def _describe_func(f):
+    if f is None:
+        return None
+    if f.__code__ is _DEFAULT_SETTER_CODE:
+        return 'default setter'
+    if f.__code__ is _DEFAULT_DELETER_CODE:
+        return 'default deleter'
+    if _is_single_flight(f):
+        return 'single flight', _describe_func(f.__wrapped__)
+    if _is_async_getter(f):
+        return 'async getter', f.__wrapped__
+    if _is_future_getter(f):
+        return 'future getter', f.__wrapped__
+    if _is_invalidating(f):
+        return 'invalidating', _describe_func(f.__wrapped__), _invalidated_names(f)
+    return f
+
+def _is_single_flight(f):
+    return getattr(f, '__code__', None) is _SINGLE_FLIGHT_CODE
+
+def _is_async_getter(f):
+    return getattr(f, '__code__', None) is _ASYNC_GETTER_CODE
+
+def _is_future_getter(f):
+    return getattr(f, '__code__', None) is _FUTURE_GETTER_CODE
+
+def _is_invalidating(f):
+    return getattr(f, '__code__', None) is _INVALIDATING_CODE
+
+def _invalidated_names(f):
+    cells = dict(zip(f.__code__.co_freevars, f.__closure__))
+    return cells['names'].cell_contents
+
+def _is_getter_wrapper(attr):
+    return callable(attr) and _WRAPPER_ATTR in getattr(attr, '__dict__', {})
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -585,3 +585,518 @@ def test_docstrings_immutable(decorator):
     ex = Example()
     assert Example.attr.__doc__ == "get attr"
 
+
+def test_inherit_from_undecorated_parent():
+    @autoprop
+    class Grandparent: #
+        def get_attr(self): #
+            return 'grandparent'
+        def set_attr(self, value): #
+            self._attr = ['grandparent', value]
+
+    class Parent(Grandparent): #
+        def set_attr(self, value): #
+            self._attr = ['parent', value]
+
+    @autoprop
+    class Child(Parent): #
+        def get_attr(self): #
+            return ['child', *self._attr]
+
+    c = Child()
+    c.attr = 'x'
+    assert c.attr == ['child', 'parent', 'x']
+
+def test_inherit_diamond():
+    @autoprop
+    class A: #
+        def set_attr(self, value): #
+            self._attr = ['a', value]
+
+    @autoprop
+    class B(A): #
+        pass
+
+    @autoprop
+    class C(A): #
+        def set_attr(self, value): #
+            self._attr = ['c', value]
+
+    @autoprop
+    class D(B, C): #
+        def get_attr(self): #
+            return ['d', *self._attr]
+
+    d = D()
+    d.attr = 'x'
+    assert d.attr == ['d', 'c', 'x']
+
+def test_inherit_shadowed_accessor():
+    @autoprop
+    class Parent: #
+        def get_attr(self): #
+            return 'parent'
+        def set_attr(self, value): #
+            pass
+
+    @autoprop
+    class Child(Parent): #
+        set_attr = None
+        def get_attr(self): #
+            return 'child'
+
+    c = Child()
+    assert c.attr == 'child'
+    with pytest.raises(AttributeError):
+        c.attr = 'x'
+
+def test_inherit_cached_getter():
+    # The child should use the parent's original getter, not the wrapper that 
+    # the parent's cache policy put in its place.
+
+    @autoprop.cache
+    class Parent: #
+        def get_attr(self): #
+            return 'parent'
+
+    @autoprop
+    class Child(Parent): #
+        def set_attr(self, value): #
+            pass
+
+    c = Child()
+    assert c.attr == 'parent'
+    assert c.get_attr() == 'parent'
+
+def test_decorate_subclass_incrementally(monkeypatch):
+    from autoprop import decorators
+
+    @autoprop
+    class Parent: #
+        def get_a(self): #
+            return 'a'
+        def get_b(self): #
+            return 'b'
+        def set_b(self, value): #
+            pass
+
+    checked = []
+    make_accessor = decorators._make_accessor
+
+    def spy(cls, name, attr):
+        checked.append(name)
+        return make_accessor(cls, name, attr)
+
+    monkeypatch.setattr(decorators, '_make_accessor', spy)
+
+    @autoprop
+    class Child(Parent): #
+        def get_b(self): #
+            return 'child b'
+
+    assert 'get_a' not in checked
+    assert 'set_b' not in checked
+
+    c = Child()
+    assert c.a == 'a'
+    assert c.b == 'child b'
+    c.b = 'x'
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_redecorate(lazy):
+    # The innermost decorator determines the policy of every property that it 
+    # makes.
+
+    @autoprop.cache(policy='manual')
+    @autoprop(lazy=lazy)
+    class Example: #
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    ex = Example()
+    assert ex.attr == 1
+    ex._attr = 2
+    assert ex.attr == 2
+    assert ex.get_attr() == 2
+
+    # Later decorators only make properties for new accessors.
+    def get_attr2(self): #
+        return self._attr
+
+    Example.get_attr2 = get_attr2
+    Example = autoprop.cache(policy='manual')(Example)
+
+    ex = Example()
+    assert ex.attr == ex.attr2 == 1
+    ex._attr = 2
+    assert ex.attr == ex.get_attr() == 2
+    assert ex.attr2 == ex.get_attr2() == 1
+
+def test_mixin():
+    class Parent(autoprop.Autoprop): #
+        def __init__(self): #
+            self._attr = 'parent'
+        def get_attr(self): #
+            return self._attr
+        def set_attr(self, value): #
+            self._attr = value
+
+    class Child(Parent): #
+        def get_attr(self): #
+            return self._attr + '-child'
+
+    p = Parent()
+    c = Child()
+
+    assert p.attr == 'parent'
+    assert c.attr == 'parent-child'
+
+    p.attr = 'x'
+    c.attr = 'y'
+
+    assert p.attr == 'x'
+    assert c.attr == 'y-child'
+
+@pytest.mark.parametrize(
+    'cache, expected', [
+        ('dynamic', 2),
+        (False, 2),
+        ('manual', 1),
+        (True, 1),
+        ({'policy': 'automatic', 'watch': ['_y']}, 1),
+    ],
+)
+def test_mixin_cache(cache, expected):
+    class Parent(autoprop.Autoprop, cache=cache): #
+        def __init__(self): #
+            self._attr = 1
+            self._y = None
+        def get_attr(self): #
+            return self._attr
+
+    # The policy is inherited by subclasses.
+    class Child(Parent): #
+        def get_attr2(self): #
+            return self._attr
+
+    p = Parent()
+    c = Child()
+
+    assert p.attr == 1
+    assert c.attr == 1
+    assert c.attr2 == 1
+
+    p._attr = c._attr = 2
+
+    assert p.attr == expected
+    assert c.attr == expected
+    assert c.attr2 == expected
+
+def test_mixin_override_cache():
+    class Parent(autoprop.Autoprop, cache='manual'): #
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    class Child(Parent, cache='dynamic'): #
+        def get_attr(self): #
+            return self._attr
+
+    @autoprop
+    class Decorated(Parent): #
+        def get_attr(self): #
+            return self._attr
+
+    p = Parent()
+    c = Child()
+    d = Decorated()
+
+    p._attr = c._attr = d._attr = 2
+
+    assert p.attr == 2
+    assert c.attr == 2
+    assert d.attr == 2
+
+    p._attr = c._attr = d._attr = 3
+
+    assert p.attr == 2
+    assert c.attr == 3
+    assert d.attr == 3
+
+def test_mixin_slots():
+    class Parent(autoprop.Autoprop): #
+        __slots__ = '_attr',
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    p = Parent()
+    assert p.attr == 1
+    assert not hasattr(p, '__dict__')
+
+def test_mixin_cache_options():
+    class Parent(autoprop.Autoprop, cache={'policy': 'manual', 'storage': 'weak'}): #
+        __slots__ = '_attr', '__weakref__'
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    class Lazy(autoprop.Autoprop, cache={'policy': 'manual', 'lazy': True}): #
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    assert '__autoprop_manifest' not in Lazy.__dict__
+
+    for cls in [Parent, Lazy]:
+        obj = cls()
+        assert obj.attr == 1
+        obj._attr = 2
+        assert obj.attr == 1
+
+def test_mixin_lazy_parent():
+    class Parent(autoprop.Autoprop, cache={'policy': 'manual', 'lazy': True}): #
+        def __init__(self): #
+            self._attr = 1
+        def get_attr(self): #
+            return self._attr
+
+    # The subclass inherits the policy, and doesn't resolve its parent.
+    class Child(Parent): #
+        def get_attr2(self): #
+            return self._attr
+
+    assert '__autoprop_manifest' not in Parent.__dict__
+    assert '__autoprop_manifest' not in Child.__dict__
+
+    c = Child()
+    assert c.attr == c.attr2 == 1
+    c._attr = 2
+    assert c.attr == c.attr2 == 1
+
+    p = Parent()
+    p._attr = 2
+    assert p.attr == 2
+    p._attr = 3
+    assert p.attr == 2
+
+def test_mixin_cache_slots_err():
+    with pytest.raises(TypeError, match="can't add cache slots to .*Parent"):
+        class Parent(autoprop.Autoprop, cache='manual'): #
+            __slots__ = '_attr',
+            def get_attr(self): #
+                return self._attr
+
+    with pytest.raises(TypeError, match="can't add cache slots to .*Parent"):
+        class Parent(autoprop.Autoprop, cache={'policy': 'manual', 'slots': True}): #
+            def get_attr(self): #
+                return self._attr
+
+def test_mixin_unknown_policy_err():
+    with pytest.raises(ValueError, match='unknown policy'):
+        class Example(autoprop.Autoprop, cache='xxx'):
+            pass
+
+def _describe_class(cls):
+    # Summarize a class in a way that can be compared between classes that 
+    # were decorated in different ways.
+    return {
+            k: type(v).__name__
+            for k, v in vars(cls).items()
+            if k not in ('__dict__', '__weakref__', '__autoprop_manifest')
+    }
+
+@pytest.mark.parametrize(
+    'eager, lazy', [
+        (autoprop, autoprop(lazy=True)),
+        (autoprop.cache, autoprop.cache(lazy=True)),
+        (
+            autoprop.cache(policy='manual'),
+            autoprop.cache(policy='manual', lazy=True),
+        ),
+    ],
+)
+def test_lazy(eager, lazy):
+
+    def make_class(decorator):
+        @decorator
+        class Example: #
+            def __init__(self): #
+                self._attr = 1
+            def get_attr(self): #
+                "get attr"
+                return self._attr
+            def get_wrong_args(self, x): #
+                pass
+            def _get_protected(self): #
+                return 2
+            def get_x(self): #
+                return 3
+            x = 'class var'
+
+        return Example
+
+    Eager = make_class(eager)
+    Lazy = make_class(lazy)
+
+    assert _describe_class(Lazy) != _describe_class(Eager)
+
+    ex = Lazy()
+
+    assert _describe_class(Lazy) == _describe_class(Eager)
+    assert ex.attr == 1
+    assert ex._protected == 2
+    assert ex.x == 'class var'
+
+def test_lazy_class_attr():
+    @autoprop(lazy=True)
+    class Example: #
+        def get_attr(self): #
+            "get attr"
+            pass
+
+    assert Example.attr.__doc__ == "get attr"
+    assert isinstance(Example.__dict__['attr'], property)
+    assert '__init__' not in Example.__dict__
+
+    with pytest.raises(AttributeError):
+        Example.wrong_args
+
+def test_lazy_class_accessor():
+    # Looking up an accessor via the class finishes decorating the class, so 
+    # that the same wrapper is found as for an eagerly decorated class.
+    def make_class(decorator):
+        @decorator
+        class Example: #
+            def __init__(self, x): #
+                self._attr = x
+            def get_attr(self): #
+                return self._attr
+        return Example
+
+    Eager = make_class(autoprop.cache(policy='manual'))
+    Lazy = make_class(autoprop.cache(policy='manual', lazy=True))
+
+    getter = Lazy.get_attr
+    assert '__autoprop_getter_wrapper' in Eager.get_attr.__dict__
+    assert '__autoprop_getter_wrapper' in getter.__dict__
+    assert isinstance(Lazy.__dict__['attr'], property)
+
+    # The wrapper works even for instances that weren't initialized.
+    obj = Lazy.__new__(Lazy)
+    obj._attr = 1
+    assert getter(obj) == 1
+
+def test_lazy_signature():
+    import inspect
+
+    @autoprop(lazy=True)
+    class Example: #
+        def __init__(self, x, y=1): #
+            pass
+        def get_attr(self): #
+            pass
+
+    assert str(inspect.signature(Example)) == '(x, y=1)'
+    assert Example.__init__.__name__ == '__init__'
+
+def test_lazy_custom_new():
+    @autoprop(lazy=True)
+    class Example: #
+        def __new__(cls, x): #
+            obj = super().__new__(cls)
+            obj.new_x = x
+            return obj
+        def __init__(self, x): #
+            self._attr = x
+        def get_attr(self): #
+            return self._attr
+
+    ex = Example(1)
+    assert ex.new_x == 1
+    assert ex.attr == 1
+
+    ex = Example(2)
+    assert ex.new_x == 2
+    assert ex.attr == 2
+
+def test_lazy_inheritance():
+    @autoprop(lazy=True)
+    class Parent: #
+        def __init__(self): #
+            self._attr = 'parent'
+        def get_attr(self): #
+            return self._attr
+        def set_attr(self, value): #
+            self._attr = value
+
+    @autoprop(lazy=True)
+    class LazyChild(Parent): #
+        def get_attr(self): #
+            return self._attr + '-lazy'
+
+    @autoprop
+    class EagerChild(Parent): #
+        def get_attr(self): #
+            return self._attr + '-eager'
+
+    class UndecoratedChild(Parent): #
+        pass
+
+    c = UndecoratedChild()
+    c.attr = 'x'
+    assert c.attr == 'x'
+
+    c = LazyChild()
+    c.attr = 'x'
+    assert c.attr == 'x-lazy'
+
+    c = EagerChild()
+    c.attr = 'x'
+    assert c.attr == 'x-eager'
+
+def test_lazy_non_class_err():
+    with pytest.raises(ValueError, match='not a class'):
+        @autoprop.cache(lazy=True)
+        def get_attr(self):
+            pass
+
+def test_lazy_init():
+    @autoprop(lazy=True)
+    class Parent: #
+        def __init__(self, x): #
+            self._attr = x
+        def get_attr(self): #
+            return self._attr
+
+    class Child(Parent): #
+        def __init__(self, x): #
+            super().__init__(x + 1)
+
+    c = Child(1)
+    assert c.attr == 2
+    assert '__init__' in Parent.__dict__
+
+    p = Parent(1)
+    assert p.attr == 1
+    p = Parent(2)
+    assert p.attr == 2
+
+    @autoprop(lazy=True)
+    class NoInit: #
+        def get_attr(self): #
+            return 1
+
+    with pytest.raises(TypeError):
+        NoInit(1)
+
+    assert NoInit().attr == 1
+
+    with pytest.raises(TypeError):
+        NoInit(1)
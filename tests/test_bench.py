@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+
+import pytest
+import json
+import autoprop
+
+from autoprop.bench import compare_to_baseline, format_table
+from autoprop.bench.__main__ import main
+
+def test_compare_to_baseline():
+    baseline = {
+            'a': {'x': 1.0, 'y': 2.0, 'z': None},
+            'b': {'x': 1.0},
+    }
+    results = {
+            'a': {'x': 1.4, 'y': 3.1, 'z': 5.0},
+            'b': {'x': 0.5, 'w': 9.0},
+            'c': {'x': 9.0},
+    }
+
+    assert compare_to_baseline(results, baseline, tolerance=0.5) == [
+            (('a', 'y'), 3.1, 2.0),
+    ]
+    assert compare_to_baseline(results, baseline, tolerance=0.3) == [
+            (('a', 'x'), 1.4, 1.0),
+            (('a', 'y'), 3.1, 2.0),
+    ]
+
+def test_format_table():
+    table = format_table(
+            [['a', 1.234, None], ['bcd', 10.0, 2]],
+            header=['', 'x', 'y'],
+    )
+    assert table == '''\
+        x  y
+---  ----  -
+  a   1.2  -
+bcd  10.0  2'''
+
+@pytest.fixture
+def fast_latency(monkeypatch):
+    from autoprop.bench import latency
+    monkeypatch.setattr(latency, 'REUSED_OBJECTS', 2)
+    monkeypatch.setattr(latency, 'REUSED_LOOPS', 1)
+
+def test_latency(fast_latency, tmp_path, capsys):
+    out = tmp_path / 'out.json'
+    argv = ['latency', '-n', '1000', '-r', '1', '-s', 'manual', '-s', 'automatic']
+
+    assert main([*argv, '-o', str(out), '--no-baseline']) == 0
+
+    results = json.loads(out.read_text())
+    assert set(results['times']) == {'property', 'manual', 'automatic'}
+    assert results['relative']['property']['hit'] == 1
+    assert results['relative']['manual']['clear'] is not None
+    assert results['relative']['property']['clear'] is None
+
+    # Compare against a baseline that the new results can't possibly match.
+    for ops in results['relative'].values():
+        for op in ops:
+            if ops[op] is not None:
+                ops[op] /= 1e6
+    out.write_text(json.dumps(results))
+
+    assert main([*argv, '-b', str(out)]) == 1
+    assert 'Regressions relative to' in capsys.readouterr().out
+
+def test_memory(tmp_path, capsys):
+    out = tmp_path / 'out.json'
+    argv = ['memory', '-m', '10', '-p', '1', '-p', '3', '-s', 'dynamic', '-s', 'manual']
+
+    assert main([*argv, '-o', str(out), '--no-baseline']) == 0
+
+    results = json.loads(out.read_text())
+    assert results['instances'] == 10
+    assert results['per_instance']['dynamic'] == {'1': 0, '3': 0}
+    assert results['per_instance']['manual']['3'] > 0
+    assert results['per_value']['manual']['3'] == \
+            pytest.approx(results['per_instance']['manual']['3'] / 3)
+
+    results['per_instance']['manual']['3'] /= 2
+    out.write_text(json.dumps(results))
+
+    assert main([*argv, '-b', str(out)]) == 1
+    assert 'manual (3 props)' in capsys.readouterr().out
+
+def test_decoration(tmp_path):
+    out = tmp_path / 'out.json'
+    argv = ['decoration', '-n', '10', '-r', '1', '-H', 'deep', '-d', 'manual']
+
+    assert main([*argv, '-o', str(out), '--no-baseline']) == 0
+
+    results = json.loads(out.read_text())
+    assert set(results['times']) == {'deep/manual'}
+    assert results['times']['deep/manual']['decorate'] > 0
+    assert results['times']['deep/manual']['import'] >= 0
+    assert results['autoprop_import'] > 0
+
+def test_threads(tmp_path, monkeypatch):
+    from autoprop.bench import threads
+    monkeypatch.setattr(threads, 'DELAY', 0.01)
+
+    out = tmp_path / 'out.json'
+    argv = ['threads', '-n', '2', '-T', '4', '-s', 'cached_property', '-s', 'overwrite, lock']
+
+    assert main([*argv, '-o', str(out)]) == 0
+
+    results = json.loads(out.read_text())
+    assert results['speedup']['overwrite, lock']['4'] > 2
+    assert results['calls']['overwrite, lock']['4'] == 1
+
+def test_stress(tmp_path):
+    out = tmp_path / 'out.json'
+    argv = ['stress', '-n', '2', '-N', '500', '-i', '3', '-T', '1', '-T', '4', '-S', '1e-5', '-s', 'manual', '-s', 'automatic, delete']
+
+    assert main([*argv, '-o', str(out)]) == 0
+
+    results = json.loads(out.read_text())
+    assert results['errors'] == []
+    assert set(results['throughput']) == {'manual', 'automatic, delete'}
+    assert results['throughput']['manual']['4'] > 0
+
+@pytest.mark.parametrize('hierarchy', ['wide', 'deep', 'noisy'])
+def test_decoration_sources(hierarchy):
+    from autoprop.bench.decoration import HIERARCHIES
+
+    scope = {'DECORATE': autoprop.cache(policy='manual')}
+    exec(HIERARCHIES[hierarchy](20), scope)
+
+    classes = [x for x in scope.values() if isinstance(x, type)]
+    assert len(classes) == 20
+
+    for cls in classes:
+        assert any(isinstance(x, property) for x in vars(cls).values())
+
@@ -2,6 +2,14 @@
 
 import pytest
 import autoprop
+import asyncio
+import copy
+import pickle
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum, auto
 from contextlib import suppress as nullcontext
 
@@ -415,6 +423,223 @@ def test_policy_automatic(inherit_methods, mutator_impl, watch, perturb, expecte
             expected,
     )
 
+def test_policy_automatic_watch_names():
+
+    class Inner:
+        def __init__(self):
+            self.a = 0
+
+    @autoprop.cache(policy='automatic', watch=['inner.a', 'class', 'not valid', '_y'])
+    class MyObj:
+
+        def __init__(self):
+            self.inner = Inner()
+            self._y = 0
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            return self.n
+
+    obj = MyObj()
+    assert obj.x == 1
+    assert obj.x == 1
+
+    obj.inner.a = 1
+    assert obj.x == 2
+
+    setattr(obj, 'class', 1)
+    assert obj.x == 3
+
+    setattr(obj, 'not valid', 1)
+    assert obj.x == 4
+
+    obj._y = 1
+    assert obj.x == 5
+
+    del obj.inner
+    assert obj.x == 6
+    assert obj.x == 6
+
+def test_infer_watch():
+
+    class Base:
+        SCALE = 2
+
+        def _scaled_w(self):
+            return self.w * self.SCALE
+
+    @autoprop.cache(policy='automatic', watch='infer')
+    class MyObj(Base):
+
+        def __init__(self):
+            self.w = 1
+            self.h = 2
+            self._offset = 0
+            self.calls = []
+
+        def get_area(self):
+            self.calls.append('area')
+            return self._scaled_w() * self.h
+
+        def get_perimeter(self):
+            return 2 * (self.w + self.h)
+
+        def get_total(self):
+            return self.area + self.get_perimeter() + sum(
+                    self.offset for _ in range(2))
+
+        @autoprop.dynamic
+        def get_offset(self):
+            return self._offset
+
+    def watch(name):
+        return MyObj.__dict__[name].memo_manager.watch
+
+    # `calls` is only mutated, but it's still a dependency.
+    assert watch('area') == ('calls', 'w', 'SCALE', 'h')
+    assert watch('perimeter') == ('w', 'h')
+    assert watch('total') == ('area', 'perimeter', '_offset')
+
+    obj = MyObj()
+    assert obj.area == 4
+    assert obj.total == 10
+    assert obj.calls == ['area']
+
+    obj.w = 2
+    assert obj.area == 8
+    assert obj.total == 16
+    assert obj.calls == ['area', 'area']
+
+    obj.SCALE = 1
+    assert obj.area == 4
+    assert obj.calls == ['area', 'area', 'area']
+
+def test_infer_watch_writes():
+    # Attributes that the getter assigns itself aren't dependencies.
+
+    @autoprop.cache(policy='automatic', watch='infer')
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            self.last = self.y
+            return self.y
+
+    assert MyObj.x.memo_manager.watch == ('y',)
+
+    obj = MyObj()
+    assert obj.x == obj.x == 1
+    assert obj.n == 1
+
+def test_infer_watch_versioned():
+
+    @autoprop.cache(policy='automatic', watch='infer', versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+
+        def get_x(self):
+            return 2 * self.y
+
+    assert MyObj.x.memo_manager.watch == ('y',)
+
+    obj = MyObj()
+    assert obj.x == 2
+
+    obj.y = 2
+    assert obj.x == 4
+
+def test_infer_watch_load_closure(monkeypatch):
+    # Python 3.13 loads closure variables with `LOAD_FAST` instead of 
+    # `LOAD_CLOSURE`.  Simulate that on older versions.
+    import dis
+    get_instructions = dis.get_instructions
+
+    def get_instructions_313(*args, **kwargs):
+        for instr in get_instructions(*args, **kwargs):
+            if instr.opname == 'LOAD_CLOSURE':
+                instr = instr._replace(opname='LOAD_FAST')
+            yield instr
+
+    monkeypatch.setattr(dis, 'get_instructions', get_instructions_313)
+
+    @autoprop.cache(policy='automatic', watch='infer')
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+            self.z = 2
+
+        def get_x(self):
+            n = 2
+            return self.z + sum(self.y * n for _ in range(n))
+
+    assert MyObj.x.memo_manager.watch == ('z', 'y')
+
+    obj = MyObj()
+    assert obj.x == 6
+
+    obj.y = 2
+    assert obj.x == 10
+
+@pytest.mark.parametrize(
+        'body, reason', [
+            ('return len(self)', "uses `self` for something"),
+            ('return f(self)', "uses `self` for something"),
+            ('return self', "uses `self` for something"),
+            ('return getattr(self, "y")', "uses `self` for something"),
+            ('return super().get_x()', r"calls `super\(\)`"),
+            ('self = 1', "assigns `self`"),
+            ('return self.helper()', "uses `self` for something"),
+        ],
+)
+def test_infer_watch_err(body, reason):
+    src = f"""\
+@autoprop.cache(policy='automatic', watch='infer')
+class MyObj:
+
+    def helper(self):
+        return f(self)
+
+    def get_x(self):
+        {body}
+"""
+    with pytest.raises(ValueError, match=reason):
+        exec(src, {'autoprop': autoprop, 'f': id})
+
+def test_getter_wrapper_subclass():
+    # The getter wrapper reads the cache directly, but that shouldn't stop 
+    # subclasses from redefining the property.
+
+    @autoprop.cache(policy='manual')
+    class Parent:
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            return self.n
+
+    class Child(Parent):
+
+        @property
+        def x(self):
+            return 'child'
+
+    p = Parent()
+    assert p.x == p.get_x() == 1
+
+    c = Child()
+    autoprop.set_cached_attr(c, 'x', 'cached')
+    assert c.x == c.get_x() == 'child'
+
 @pytest.mark.parametrize(
         'class_decorator, getter_decorator', [
             *make_policy_decorators('immutable'),
@@ -749,6 +974,2113 @@ def test_manipulate_cached_attr():
     assert obj.x == 2
     assert autoprop.get_cached_attr(obj, 'x') == 2
 
+@pytest.mark.parametrize('instantiate_child_first', [False, True])
+def test_cache_multiple_inheritance(instantiate_child_first):
+    # Each base class assigns its cached properties the same positions in the 
+    # cache, so the child class has to move some of them.
+
+    @autoprop.cache(policy='manual')
+    class A:
+        def get_a(self):
+            return 'a'
+
+    @autoprop.cache(policy='automatic', watch=['w'])
+    class B:
+        def __init__(self):
+            self.w = 1
+        def get_b(self):
+            return ['b', self.w]
+
+    class C(A, B):
+        pass
+
+    @autoprop.immutable
+    class D(C):
+        def get_d(self):
+            return 'd'
+
+    objs = [D(), C()] if instantiate_child_first else [C(), D()]
+
+    for obj in objs:
+        assert obj.a == 'a'
+        assert obj.b == ['b', 1]
+        assert obj.a == 'a'
+        assert obj.b == ['b', 1]
+
+        obj.w = 2
+        assert obj.a == 'a'
+        assert obj.b == ['b', 2]
+
+        autoprop.set_cached_attr(obj, 'b', 'set')
+        assert obj.b == 'set'
+        assert obj.a == 'a'
+
+    assert objs[0 if instantiate_child_first else 1].d == 'd'
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_cache_multiple_inheritance_late_base(lazy):
+    # The child class and its instances can exist before a secondary base 
+    # class gets its cached properties.
+
+    @autoprop.cache(policy='manual')
+    class A:
+        def get_a(self):
+            return 'a'
+
+    class B:
+        def get_b(self):
+            return 'b'
+
+    class C(A, B):
+        pass
+
+    obj = C()
+    assert obj.a == 'a'
+
+    autoprop.cache(policy='manual', lazy=lazy)(B)
+
+    assert obj.b == 'b'
+    assert obj.a == 'a'
+    assert C().b == 'b'
+    assert C().a == 'a'
+
+def test_cache_multiple_inheritance_lazy_base():
+
+    @autoprop.cache(policy='manual')
+    class A:
+        def get_a(self):
+            return 'a'
+
+    @autoprop.cache(policy='manual', lazy=True)
+    class B:
+        def get_b(self):
+            return 'b'
+
+    class C(A, B):
+        pass
+
+    obj = C()
+    assert obj.a == 'a'
+    assert obj.b == 'b'
+    assert obj.a == 'a'
+
+def test_cache_late_primary_base():
+
+    class A:
+        def get_a(self):
+            return 'a'
+
+    @autoprop.cache(policy='manual')
+    class B(A):
+        def get_b(self):
+            return 'b'
+
+    class C(B):
+        pass
+
+    obj = C()
+    assert obj.b == 'b'
+
+    autoprop.cache(policy='manual')(A)
+
+    assert obj.a == 'a'
+    assert obj.b == 'b'
+    assert C().a == 'a'
+
+@pytest.mark.parametrize('obj', [5, object()])
+def test_cache_undecorated(obj):
+    assert autoprop.get_cached_attr(obj, 'x', None) is None
+    with pytest.raises(AttributeError):
+        autoprop.get_cached_attr(obj, 'x')
+    with pytest.raises(AttributeError):
+        autoprop.del_cached_attr(obj, 'x')
+
+    autoprop.clear_cache(obj)
+
+def test_cache_grows():
+
+    @autoprop.cache(policy='manual')
+    class MyObj:
+        def get_x(self):
+            return 'x'
+
+    obj = MyObj()
+    assert obj.x == 'x'
+
+    # Values that don't belong to any property can still be cached.
+    assert autoprop.get_cached_attr(obj, 'y', None) == None
+    autoprop.set_cached_attr(obj, 'y', 'y')
+    assert autoprop.get_cached_attr(obj, 'y') == 'y'
+    autoprop.del_cached_attr(obj, 'y')
+    assert autoprop.get_cached_attr(obj, 'y', None) == None
+
+    # Properties added after the cache was created should still work.
+    def get_z(self):
+        return 'z'
+
+    MyObj.get_z = get_z
+    autoprop.cache(policy='manual')(MyObj)
+
+    assert obj.x == 'x'
+    assert obj.z == 'z'
+    assert autoprop.get_cached_attr(obj, 'z') == 'z'
+
+# Pickled classes have to be defined at the module level.
+
+@autoprop.cache(policy='manual')
+class PickleManual:
+
+    def get_a(self):
+        return 2
+
+    def get_b(self):
+        return 3
+
+@autoprop.cache(policy='automatic', watch=['y'])
+class PickleAutomatic:
+
+    def __init__(self):
+        self.y = 1
+
+    def get_a(self):
+        return 2
+
+    def get_b(self):
+        return 3
+
+@autoprop.cache(policy='manual', slots=True)
+class PickleSlots:
+
+    def get_a(self):
+        return 2
+
+    def get_b(self):
+        return 3
+
+@autoprop.cache(policy='tracked')
+class PickleTracked:
+
+    def __init__(self):
+        self.y = 1
+
+    def get_a(self):
+        return 2 * self.y
+
+    def get_b(self):
+        return 3 * self.y
+
+@pytest.mark.parametrize('cls', [PickleManual, PickleAutomatic, PickleSlots, PickleTracked])
+@pytest.mark.parametrize(
+        'copy_obj', [
+            lambda x: pickle.loads(pickle.dumps(x)),
+            copy.copy,
+            copy.deepcopy,
+        ],
+        ids=['pickle', 'copy', 'deepcopy'],
+)
+def test_copy_partial_cache(cls, copy_obj):
+    # Only some of the values are cached, and some are set by hand.
+    obj = cls()
+    assert obj.a == 2
+    autoprop.set_cached_attr(obj, 'c', 4)
+
+    copied = copy_obj(obj)
+    assert copied.a == 2
+    assert copied.b == 3
+    assert autoprop.get_cached_attr(copied, 'c') == 4
+
+@pytest.mark.parametrize(
+        'decorator', [
+            autoprop.cache,
+            autoprop.cache(policy='manual'),
+            autoprop.cache(policy='automatic', watch=['_y']),
+            autoprop.immutable,
+            autoprop.cache(lazy=True),
+        ]
+)
+def test_slots(decorator):
+
+    class Base:
+        __slots__ = ()
+
+        def describe(self):
+            return 'base'
+
+    @decorator
+    class MyObj(Base):
+        __slots__ = '_y', 'n'
+
+        def __init__(self):
+            self._y = 0
+            self.n = 0
+
+        def get_x(self):
+            "get x"
+            self.n += 1
+            return self.n
+
+        def describe(self):
+            return 'child ' + super().describe()
+
+    obj = MyObj()
+
+    assert not hasattr(obj, '__dict__')
+    assert obj.describe() == 'child base'
+    assert MyObj.x.__doc__ == "get x"
+
+    assert obj.x == 1
+    assert obj.x == 1
+    assert obj.get_x() == 1
+    assert autoprop.get_cached_attr(obj, 'x') == 1
+
+    autoprop.clear_cache(obj)
+    assert autoprop.get_cached_attr(obj, 'x', None) is None
+    assert obj.x == 2
+
+    autoprop.set_cached_attr(obj, 'x', 'set')
+    assert obj.x == 'set'
+
+    autoprop.del_cached_attr(obj, 'x')
+    assert obj.x == 3
+
+    with pytest.raises(AttributeError):
+        autoprop.del_cached_attr(obj, 'y')
+
+def test_slots_explicit():
+    import weakref
+
+    @autoprop.cache(policy='manual', slots=True)
+    class MyObj:
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            return self.n
+
+    obj = MyObj()
+    assert obj.x == obj.x == 1
+    assert obj.__dict__ == {'n': 1}
+    assert weakref.ref(obj)() is obj
+
+def test_slots_subclass():
+
+    @autoprop.cache(policy='manual')
+    class Parent:
+        __slots__ = 'n',
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            return ['x', self.n]
+
+    @autoprop.cache(policy='manual')
+    class Child(Parent):
+        __slots__ = ()
+
+        def get_x(self):
+            self.n += 1
+            return ['child x', self.n]
+
+        def get_y(self):
+            return 'y'
+
+    obj = Child()
+    assert obj.x == obj.x == ['child x', 1]
+    assert obj.y == 'y'
+
+    autoprop.clear_cache(obj)
+    assert obj.x == ['child x', 2]
+
+def test_slots_function_err():
+    with pytest.raises(ValueError, match="can't specify slots"):
+        @autoprop.cache(policy='manual', slots=True)
+        def get_x(self):
+            pass
+
+@pytest.mark.parametrize(
+        'decorator', [
+            autoprop.cache(storage='weak'),
+            autoprop.cache(policy='manual', storage='weak'),
+            autoprop.cache(policy='automatic', watch=['n'], storage='weak'),
+            autoprop.cache(policy='immutable', storage='weak'),
+            autoprop.cache(policy='manual', storage='weak', lazy=True),
+        ],
+)
+def test_storage_weak(decorator):
+    import gc
+
+    class Base:
+        __slots__ = 'n', '__weakref__'
+
+    @decorator
+    class MyObj(Base):
+        __slots__ = ()
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            return ['x', self.n]
+
+    obj = MyObj()
+    assert obj.x is obj.x
+    assert obj.x == obj.get_x() == ['x', 0]
+
+    x = obj.x
+    autoprop.clear_cache(obj)
+    assert obj.x == x
+    assert obj.x is not x
+
+    # The class wasn't rebuilt to add slots.
+    assert MyObj.__slots__ == ()
+
+    records = vars(MyObj)['__autoprop_cache'].records
+    assert len(records) == 1
+
+    del obj
+    gc.collect()
+    assert records == {}
+
+def test_storage_weak_overwrite():
+    @autoprop.cache(storage='weak')
+    class MyObj:
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            self.n += 1
+            return self.n
+
+    obj = MyObj()
+    assert obj.x == obj.x == 1
+    assert vars(obj) == {'n': 1}
+
+    obj.x = 'set'
+    assert obj.x == 'set'
+
+    del obj.x
+    assert obj.x == 2
+
+def test_storage_weak_unhashable():
+    # Objects are identified by `id()`, so they don't need to be hashable, and 
+    # equal objects still get their own caches.
+
+    @autoprop.cache(policy='manual', storage='weak')
+    class MyObj:
+        __hash__ = None
+
+        def __init__(self, n):
+            self.n = n
+
+        def __eq__(self, other):
+            return True
+
+        def get_x(self):
+            return self.n
+
+    a, b = MyObj(1), MyObj(2)
+    assert a.x == 1
+    assert b.x == 2
+
+def test_storage_weak_no_weakref_err():
+    @autoprop.cache(policy='manual', storage='weak')
+    class MyObj:
+        __slots__ = ()
+
+        def get_x(self):
+            return 1
+
+    with pytest.raises(TypeError, match="weak references"):
+        MyObj().x
+
+def test_storage_err():
+    with pytest.raises(ValueError, match="unknown storage"):
+        autoprop.cache(policy='manual', storage='xxx')
+
+    with pytest.raises(ValueError, match="can't specify both"):
+        autoprop.cache(policy='manual', storage='weak', slots=True)
+
+    with pytest.raises(ValueError, match="unknown storage"):
+        autoprop.cache(policy='manual', storage=object())
+
+    with pytest.raises(ValueError, match="can't specify storage"):
+        @autoprop.cache(policy='manual', storage='weak')
+        def get_x(self):
+            pass
+
+class TableStorage(autoprop.Storage):
+
+    def __init__(self):
+        self.values = {}
+        self.memos = {}
+
+    def get(self, obj, name):
+        return self.values[id(obj), name]
+
+    def set(self, obj, name, value, memo=None):
+        self.values[id(obj), name] = value
+        self.memos[id(obj), name] = memo
+
+    def delete(self, obj, name):
+        del self.values[id(obj), name]
+        self.memos.pop((id(obj), name), None)
+
+    def get_memo(self, obj, name):
+        return self.memos[id(obj), name]
+
+    def clear(self, obj):
+        for table in [self.values, self.memos]:
+            for key in list(table):
+                if key[0] == id(obj):
+                    del table[key]
+
+    def items(self, obj):
+        for (key, name), value in self.values.items():
+            if key == id(obj):
+                yield name, value
+
+@pytest.mark.parametrize(
+        'policy, kwargs', [
+            ('overwrite', {}),
+            ('manual', {}),
+            ('manual', {'provide_mutators': True}),
+            ('automatic', {'watch': ['n']}),
+            ('immutable', {}),
+        ],
+)
+def test_storage_custom(policy, kwargs):
+    storage = TableStorage()
+
+    @autoprop.cache(policy=policy, storage=storage, **kwargs)
+    class MyObj:
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            return ['x', self.n]
+
+    obj = MyObj()
+    assert obj.x is obj.x
+    assert obj.x == obj.get_x() == ['x', 0]
+    assert dict(storage.items(obj)) == {'x': ['x', 0]}
+    assert autoprop.get_cached_attr(obj, 'x') == ['x', 0]
+
+    if policy == 'automatic':
+        obj.n = 1
+        assert obj.x == ['x', 1]
+
+    autoprop.set_cached_attr(obj, 'x', 'set')
+    assert obj.x == 'set'
+
+    autoprop.del_cached_attr(obj, 'x')
+    assert obj.x == ['x', obj.n]
+
+    autoprop.clear_cache(obj)
+    assert list(storage.items(obj)) == []
+
+    with pytest.raises(AttributeError):
+        autoprop.del_cached_attr(obj, 'x')
+
+    # Subclasses inherit the storage.
+    @autoprop
+    class Child(MyObj):
+        def get_y(self):
+            return 'y'
+
+    child = Child()
+    assert child.x == ['x', 0]
+    assert storage.get(child, 'x') == ['x', 0]
+
+def test_storage_custom_delete_race():
+    # Simulate another thread deleting the value right after the memo is 
+    # read.  The value should be recalculated, rather than raising.
+
+    class RacyStorage(TableStorage):
+
+        def get_memo(self, obj, name):
+            memo = super().get_memo(obj, name)
+            self.values.pop((id(obj), name), None)
+            return memo
+
+    @autoprop.cache(policy='automatic', watch=['n'], storage=RacyStorage())
+    class MyObj:
+
+        def __init__(self):
+            self.n = 0
+            self.calls = 0
+
+        def get_x(self):
+            self.calls += 1
+            return self.n
+
+    obj = MyObj()
+    assert obj.x == 0
+    assert obj.x == 0
+    assert obj.calls == 2
+
+@pytest.mark.parametrize('storage', ['dict', 'slots', 'weak'])
+def test_storage_items(storage):
+
+    @autoprop.cache(policy='automatic', watch=['n'], storage=storage)
+    class MyObj:
+
+        def __init__(self):
+            self.n = 0
+
+        def get_x(self):
+            return 'x'
+
+        def get_y(self):
+            return 'y'
+
+    obj = MyObj()
+    obj_storage = getattr(MyObj, '__autoprop_storage', autoprop.DictStorage())
+
+    assert list(obj_storage.items(obj)) == []
+
+    obj.x
+    assert list(obj_storage.items(obj)) == [('x', 'x')]
+
+    autoprop.clear_cache(obj)
+    assert list(obj_storage.items(obj)) == []
+
+def test_storage_subclass_err():
+    @autoprop.cache(policy='manual', storage='weak')
+    class Parent:
+        pass
+
+    with pytest.raises(ValueError, match="can't use TableStorage"):
+        @autoprop.cache(policy='manual', storage=TableStorage())
+        class Child(Parent):
+            pass
+
+def run_threads(f, n):
+    threads = [threading.Thread(target=f) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_overwrite_threads():
+    # Different instances must be able to compute their values at the same 
+    # time.  This would time out if the computations were serialized.
+    barrier = threading.Barrier(2, timeout=5)
+    results = []
+
+    @autoprop.cache
+    class MyObj:
+        def get_x(self):
+            barrier.wait()
+            return object()
+
+    objs = [MyObj(), MyObj()]
+    run_threads(lambda: results.append(objs.pop().x), 2)
+
+    assert len(results) == 2
+    assert not barrier.broken
+
+def test_overwrite_threads_same_instance():
+    # Every thread should get the same value, even if several compute it.
+    barrier = threading.Barrier(4, timeout=5)
+    results = []
+
+    @autoprop.cache
+    class MyObj:
+        def get_x(self):
+            barrier.wait()
+            return object()
+
+    obj = MyObj()
+    run_threads(lambda: results.append(obj.x), 4)
+
+    assert len(results) == 4
+    assert all(x is obj.x for x in results)
+
+def test_overwrite_lock():
+    calls = []
+    results = []
+
+    @autoprop.cache(policy='overwrite', lock=True)
+    class MyObj:
+        def get_x(self):
+            calls.append(self)
+            time.sleep(0.01)
+            return self.y
+
+        def get_y(self):
+            # The lock is reentrant.
+            return object()
+
+    obj = MyObj()
+    run_threads(lambda: results.append(obj.x), 4)
+
+    assert calls == [obj]
+    assert all(x is obj.x for x in results)
+    assert obj.get_x() is obj.x
+
+    del obj.x
+    obj.x
+    assert calls == [obj, obj]
+
+def test_overwrite_lock_slots_err():
+    with pytest.raises(ValueError, match="locking"):
+        @autoprop.cache(policy='overwrite', lock=True)
+        class MyObj:
+            __slots__ = ()
+            def get_x(self):
+                return 1
+
+@pytest.fixture
+def fast_switching():
+    # Make threads switch as often as possible, so that races are likely to
+    # happen even with the GIL.
+    prev = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(prev)
+
+@pytest.mark.parametrize('storage', ['dict', 'weak'])
+def test_threads_record(fast_switching, storage):
+    # Every thread stores a value in each of the same new objects at once.  
+    # If two threads both made a record for an object, one's value would be 
+    # lost.
+    barrier = threading.Barrier(8, timeout=5)
+    names = iter(range(8))
+
+    @autoprop.cache(policy='manual', storage=storage)
+    class MyObj:
+        def get_x0(self): pass
+        def get_x1(self): pass
+        def get_x2(self): pass
+        def get_x3(self): pass
+        def get_x4(self): pass
+        def get_x5(self): pass
+        def get_x6(self): pass
+        def get_x7(self): pass
+
+    objs = [MyObj() for _ in range(1000)]
+
+    def store():
+        name = f'x{next(names)}'
+        barrier.wait()
+        for obj in objs:
+            autoprop.set_cached_attr(obj, name, name)
+
+    run_threads(store, 8)
+
+    for obj in objs:
+        assert set(autoprop.get_cache(obj)) == {f'x{i}' for i in range(8)}
+
+def test_threads_layout(fast_switching):
+    # Every thread caches values for attributes that don't have properties, 
+    # so each needs new indices in the layout at the same time.
+    barrier = threading.Barrier(8, timeout=5)
+    prefixes = iter(range(8))
+
+    @autoprop.cache(policy='manual')
+    class MyObj:
+        pass
+
+    obj = MyObj()
+
+    def store():
+        prefix = f'x{next(prefixes)}_'
+        barrier.wait()
+        for i in range(100):
+            autoprop.set_cached_attr(obj, prefix + str(i), prefix + str(i))
+
+    run_threads(store, 8)
+
+    for i in range(8):
+        for j in range(100):
+            name = f'x{i}_{j}'
+            assert autoprop.get_cached_attr(obj, name) == name
+
+@pytest.mark.parametrize('slots', [False, True])
+def test_threads_automatic(fast_switching, slots):
+    # Every thread reads the property, and sometimes deletes it.  Readers 
+    # must never find a memo without a value.
+    barrier = threading.Barrier(8, timeout=5)
+    errors = []
+
+    @autoprop.cache(policy='automatic', watch=['y'])
+    class MyObj:
+        if slots:
+            __slots__ = 'y',
+
+        def __init__(self):
+            self.y = [0]
+
+        def get_x(self):
+            return self.y
+
+    obj = MyObj()
+
+    def hammer():
+        barrier.wait()
+        for i in range(5000):
+            if i % 3:
+                try:
+                    x = obj.x
+                except AttributeError as err:
+                    errors.append(err)
+                else:
+                    if x is not obj.y:
+                        errors.append(x)
+            else:
+                # Another thread might've deleted the value already.
+                with nullcontext(AttributeError):
+                    autoprop.del_cached_attr(obj, 'x')
+
+    run_threads(hammer, 8)
+
+    assert errors == []
+
+def make_versioned_class(decorator, slots=False):
+
+    @decorator
+    class MyObj:
+        if slots:
+            __slots__ = 'y', 'z', 'calls'
+
+        def __init__(self):
+            self.y = 1
+            self.z = 2
+            self.calls = 0
+
+        def get_x(self):
+            self.calls += 1
+            return self.y + self.z
+
+    return MyObj
+
+VERSIONED_CLASSES = {
+        'dict': lambda: make_versioned_class(
+            autoprop.cache(policy='automatic', watch=['y', 'z'], versioned=True),
+        ),
+        'slots': lambda: make_versioned_class(
+            autoprop.cache(policy='automatic', watch=['y', 'z'], versioned=True),
+            slots=True,
+        ),
+        'slots=True': lambda: make_versioned_class(
+            autoprop.cache(policy='automatic', watch=['y', 'z'], versioned=True, slots=True),
+        ),
+        'weak': lambda: make_versioned_class(
+            autoprop.cache(policy='automatic', watch=['y', 'z'], versioned=True, storage='weak'),
+        ),
+}
+
+@pytest.mark.parametrize('make_class', VERSIONED_CLASSES.values(), ids=list(VERSIONED_CLASSES))
+def test_versioned(make_class):
+    MyObj = make_class()
+    obj = MyObj()
+
+    assert obj.x == obj.x == obj.get_x() == 3
+    assert obj.calls == 1
+
+    obj.y = 3
+    assert obj.x == obj.x == 5
+    assert obj.calls == 2
+
+    # Changing an attribute that isn't watched doesn't matter.
+    obj.calls = 10
+    assert obj.x == 5
+    assert obj.calls == 10
+
+    del obj.z
+    obj.z = 0
+    assert obj.x == 3
+    assert obj.calls == 11
+
+    # Values that were set manually aren't recalculated.
+    autoprop.set_cached_attr(obj, 'x', 'set')
+    obj.y = 4
+    assert obj.x == 'set'
+
+    autoprop.del_cached_attr(obj, 'x')
+    assert obj.x == 4
+    assert obj.calls == 12
+
+    autoprop.clear_cache(obj)
+    assert obj.x == 4
+    assert obj.calls == 13
+
+def test_versioned_separate_watches():
+    # Properties with different watch lists are only recalculated when their 
+    # own watched attributes change.
+
+    @autoprop.cache(policy='automatic', watch=['a'], versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.a = 1
+            self.b = 2
+            self.calls = []
+
+        def get_a2(self):
+            self.calls.append('a2')
+            return 2 * self.a
+
+        @autoprop.cache(policy='automatic', watch=['b'], versioned=True)
+        def get_b2(self):
+            self.calls.append('b2')
+            return 2 * self.b
+
+        @autoprop.cache(policy='automatic', watch=['a', 'b'], versioned=True)
+        def get_ab(self):
+            self.calls.append('ab')
+            return self.a + self.b
+
+    obj = MyObj()
+    assert (obj.a2, obj.b2, obj.ab) == (2, 4, 3)
+
+    obj.a = 2
+    assert (obj.a2, obj.b2, obj.ab) == (4, 4, 4)
+
+    obj.b = 3
+    assert (obj.a2, obj.b2, obj.ab) == (4, 6, 5)
+
+    assert obj.calls == ['a2', 'b2', 'ab', 'a2', 'ab', 'b2', 'ab']
+
+def test_versioned_cascade():
+    # When a watched attribute changes, every versioned property that depends 
+    # on it is invalidated at once, even if only indirectly.  Cache hits 
+    # never need to recalculate the properties they watch.
+
+    @autoprop.cache(policy='automatic', watch=['w'], versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.w = 1
+            self.h = 2
+            self.calls = []
+
+        def get_width(self):
+            self.calls.append('width')
+            return self.w
+
+        @autoprop.cache(policy='automatic', watch=['width', 'h'], versioned=True)
+        def get_area(self):
+            self.calls.append('area')
+            return self.width * self.h
+
+        @autoprop.cache(policy='automatic', watch=['area'], versioned=True)
+        def get_volume(self):
+            self.calls.append('volume')
+            return self.area * 3
+
+    obj = MyObj()
+    assert obj.volume == 6
+    assert obj.calls == ['volume', 'area', 'width']
+
+    obj.calls = []
+    assert obj.volume == 6
+    assert obj.calls == []
+
+    obj.w = 2
+    assert obj.volume == 12
+    assert obj.calls == ['volume', 'area', 'width']
+
+    obj.calls = []
+    obj.h = 1
+    assert obj.width == 2
+    assert obj.volume == 6
+    assert obj.calls == ['volume', 'area']
+
+    # Changing cached values directly also invalidates their dependents.
+    obj.calls = []
+    autoprop.set_cached_attr(obj, 'width', 10)
+    assert obj.volume == 30
+    assert obj.calls == ['volume', 'area']
+
+    obj.calls = []
+    autoprop.del_cached_attr(obj, 'width')
+    assert obj.volume == 6
+    assert obj.calls == ['volume', 'area', 'width']
+
+def test_versioned_cascade_subclass():
+    MyObj = VERSIONED_CLASSES['dict']()
+
+    @autoprop.cache(policy='automatic', watch=['x'], versioned=True)
+    class Child(MyObj):
+
+        def get_x2(self):
+            return 2 * self.x
+
+    child = Child()
+    assert child.x2 == 6
+
+    child.y = 2
+    assert child.x2 == 8
+
+def test_versioned_subclass():
+    MyObj = VERSIONED_CLASSES['dict']()
+
+    @autoprop.cache(policy='automatic', watch=['w'], versioned=True)
+    class Child(MyObj):
+
+        def __init__(self):
+            super().__init__()
+            self.w = 1
+
+        def get_v(self):
+            return -self.w
+
+    # The hooks are inherited, rather than being installed again.
+    assert '__setattr__' not in Child.__dict__
+
+    child = Child()
+    assert (child.x, child.v) == (3, -1)
+
+    child.y = 2
+    child.w = 2
+    assert (child.x, child.v) == (4, -2)
+
+def test_versioned_custom_setattr():
+    # Any `__setattr__()` defined by the class itself is still called.
+    writes = []
+
+    @autoprop.cache(policy='automatic', watch=['y'], versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+
+        def __setattr__(self, name, value):
+            writes.append(name)
+            super().__setattr__(name, value)
+
+        def get_x(self):
+            return 2 * self.y
+
+    obj = MyObj()
+    assert obj.x == 2
+
+    obj.y = 2
+    assert obj.x == 4
+    assert writes == ['y', 'y']
+
+def test_versioned_watch_err():
+    with pytest.raises(ValueError, match="only attribute names"):
+        autoprop.cache(policy='automatic', watch=['y.z'], versioned=True)(lambda self: None)
+
+    with pytest.raises(ValueError, match="only attribute names"):
+        autoprop.cache(policy='automatic', watch=[len], versioned=True)(lambda self: None)
+
+@pytest.mark.parametrize(
+        'decorator', [
+            autoprop.dynamic,
+            autoprop.cache(policy='automatic', watch=['w']),
+            autoprop.cache(policy='tracked'),
+        ],
+)
+def test_versioned_watch_computed_err(decorator):
+    # Versioned properties wouldn't notice when a computed property changes.
+
+    with pytest.raises(ValueError, match="can't watch 'width'"):
+
+        @autoprop.cache(policy='automatic', watch=['width'], versioned=True)
+        class MyObj:
+
+            def __init__(self):
+                self.w = 1
+
+            @decorator
+            def get_width(self):
+                return self.w
+
+            def get_area(self):
+                return 2 * self.width
+
+    with pytest.raises(ValueError, match="can't watch 'y'"):
+
+        @autoprop.cache(policy='automatic', watch=['y'], versioned=True)
+        class Parent:
+
+            def get_x(self):
+                return 2 * self.y
+
+        class Child(Parent):
+
+            @property
+            def y(self):
+                return 1
+
+        autoprop(Child)
+
+def test_versioned_watch_manual():
+    # Manual properties only change when they're assigned, so they can be 
+    # watched.
+
+    @autoprop.cache(policy='automatic', watch=['width'], versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.w = 1
+
+        @autoprop.cache(policy='manual')
+        def get_width(self):
+            return self.w
+
+        def set_width(self, w):
+            autoprop.set_cached_attr(self, 'width', w)
+
+        def get_area(self):
+            return 2 * self.width
+
+    obj = MyObj()
+    assert obj.area == 2
+
+    obj.width = 2
+    assert obj.area == 4
+
+def test_versioned_storage_err():
+    with pytest.raises(ValueError, match="versioned properties"):
+        make_versioned_class(autoprop.cache(
+            policy='automatic',
+            watch=['y'],
+            versioned=True,
+            storage=TableStorage(),
+        ))
+
+def test_versioned_threads(fast_switching):
+    # Every thread changes the watched attribute and reads the property.  
+    # Once they're all done, the property must reflect the last change.
+    barrier = threading.Barrier(8, timeout=5)
+
+    @autoprop.cache(policy='automatic', watch=['y'], versioned=True)
+    class MyObj:
+
+        def __init__(self):
+            self.y = [0]
+
+        def get_x(self):
+            return self.y
+
+    obj = MyObj()
+
+    def hammer():
+        barrier.wait()
+        for i in range(2000):
+            if i % 4:
+                obj.x
+            else:
+                obj.y = [i]
+
+    run_threads(hammer, 8)
+
+    assert obj.x is obj.y
+
+def make_tracked_class(decorator, slots=False):
+
+    @decorator
+    class MyObj:
+        if slots:
+            __slots__ = 'y', 'z', 'calls'
+
+        def __init__(self):
+            self.y = 1
+            self.z = 2
+            self.calls = []
+
+        def get_x(self):
+            self.calls.append('x')
+            return self.y + self.z
+
+    return MyObj
+
+TRACKED_CLASSES = {
+        'dict': lambda: make_tracked_class(
+            autoprop.cache(policy='tracked'),
+        ),
+        'slots': lambda: make_tracked_class(
+            autoprop.cache(policy='tracked'),
+            slots=True,
+        ),
+        'slots=True': lambda: make_tracked_class(
+            autoprop.cache(policy='tracked', slots=True),
+        ),
+        'weak': lambda: make_tracked_class(
+            autoprop.cache(policy='tracked', storage='weak'),
+        ),
+}
+
+@pytest.mark.parametrize('make_class', TRACKED_CLASSES.values(), ids=list(TRACKED_CLASSES))
+def test_tracked(make_class):
+    MyObj = make_class()
+    obj = MyObj()
+
+    assert obj.x == obj.x == obj.get_x() == 3
+    assert obj.calls == ['x']
+
+    obj.y = 3
+    assert obj.x == obj.x == 5
+    assert obj.calls == ['x', 'x']
+
+    # Mutating an attribute that was read, but not replacing it, doesn't 
+    # matter.
+    obj.calls.clear()
+    assert obj.x == 5
+    assert obj.calls == []
+
+    del obj.z
+    obj.z = 0
+    assert obj.x == 3
+    assert obj.calls == ['x']
+
+    # Values that were set manually aren't recalculated.
+    autoprop.set_cached_attr(obj, 'x', 'set')
+    obj.y = 4
+    assert obj.x == 'set'
+
+    autoprop.del_cached_attr(obj, 'x')
+    assert obj.x == 4
+    assert obj.calls == ['x', 'x']
+
+    autoprop.clear_cache(obj)
+    assert obj.x == 4
+    assert obj.calls == ['x', 'x', 'x']
+
+def test_tracked_indirect():
+    # Attributes read by methods, uncached properties, and other cached 
+    # properties are all dependencies.
+
+    @autoprop.cache(policy='tracked')
+    class MyObj:
+
+        def __init__(self):
+            self.a = 1
+            self.b = 2
+            self.c = 3
+            self.calls = []
+
+        def _get_a(self):
+            return self.a
+
+        @property
+        def b_plus_one(self):
+            return self.b + 1
+
+        def get_c2(self):
+            self.calls.append('c2')
+            return 2 * self.c
+
+        def get_total(self):
+            self.calls.append('total')
+            return self._get_a() + self.b_plus_one + self.c2
+
+    obj = MyObj()
+    assert obj.total == 10
+    assert obj.calls == ['total', 'c2']
+
+    obj.a = 2
+    assert obj.total == 11
+    assert obj.calls == ['total', 'c2', 'total']
+
+    obj.b = 3
+    assert obj.total == 12
+    assert obj.calls == ['total', 'c2', 'total', 'total']
+
+    obj.calls = []
+    obj.c = 4
+    assert obj.total == 14
+    assert obj.calls == ['c2', 'total']
+
+def test_tracked_branches():
+    # Only the attributes read by the most recent calculation matter.
+
+    @autoprop.cache(policy='tracked')
+    class MyObj:
+
+        def __init__(self):
+            self.flag = True
+            self.a = 1
+            self.b = 2
+            self.calls = 0
+
+        def get_x(self):
+            self.calls += 1
+            return self.a if self.flag else self.b
+
+    obj = MyObj()
+    assert obj.x == 1
+
+    obj.b = 3
+    assert obj.x == 1
+    assert obj.calls == 1
+
+    obj.flag = False
+    assert obj.x == 3
+    assert obj.calls == 2
+
+    obj.a = 4
+    assert obj.x == 3
+    assert obj.calls == 2
+
+    obj.b = 5
+    assert obj.x == 5
+    assert obj.calls == 3
+
+    # Attributes that the getter assigns itself (e.g. `calls`) aren't 
+    # dependencies.
+    obj.calls = 0
+    assert obj.x == 5
+    assert obj.calls == 0
+
+def test_tracked_undefined():
+    # Attributes that don't exist yet are dependencies too.
+
+    @autoprop.cache(policy='tracked')
+    class MyObj:
+
+        def get_x(self):
+            return getattr(self, 'y', None)
+
+    obj = MyObj()
+    assert obj.x is None
+
+    obj.y = 1
+    assert obj.x == 1
+
+    del obj.y
+    assert obj.x is None
+
+def test_tracked_self():
+    # The getter is given the object itself, so it can be stored, compared, 
+    # and referenced like any other object.
+
+    class Parent:
+        SCALE = 10
+
+        def __init__(self):
+            self.y = 1
+            self.items = [1, 2]
+
+        def get_x(self):
+            return self.y
+
+        def __len__(self):
+            return len(self.items)
+
+    class Wrapper:
+        def __init__(self, obj):
+            self.obj = obj
+
+    @autoprop.cache(policy='tracked')
+    class Child(Parent):
+
+        def get_x(self):
+            assert isinstance(self, Child)
+            assert self.__class__ is Child
+            assert len(self) == 2
+            assert bool(self)
+            return super().get_x() + 1
+
+        def get_z(self):
+            self.w = 'set in getter'
+            return self.w
+
+        def get_me(self):
+            return self
+
+        def get_ref(self):
+            return weakref.ref(self)
+
+        def get_wrapper(self):
+            return Wrapper(self)
+
+        def get_scaled(self):
+            return type(self).SCALE * self.y
+
+    obj = Child()
+    assert obj.x == 2
+
+    obj.y = 2
+    assert obj.x == 3
+
+    assert obj.z == 'set in getter'
+    assert obj.w == 'set in getter'
+
+    assert obj.me is obj
+    assert obj.ref() is obj
+    assert obj.wrapper.obj is obj
+    assert obj.scaled == 20
+
+    # Special methods are recorded like any other method.
+    obj.items = [1, 2, 3]
+    with pytest.raises(AssertionError):
+        obj.x
+
+def test_tracked_hooks():
+    # The hooks that record attribute reads are only installed while a value 
+    # is being calculated, and any hooks the class already had still apply.
+    calls = []
+
+    @autoprop.cache(policy='tracked')
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+
+        def __getattribute__(self, name):
+            if name == 'y':
+                calls.append(name)
+            return super().__getattribute__(name)
+
+        def get_x(self):
+            assert type(self).__getattribute__ is not getattribute
+            return self.y
+
+    getattribute = MyObj.__dict__['__getattribute__']
+
+    obj = MyObj()
+    assert obj.x == 1
+    assert obj.x == 1
+    assert MyObj.__dict__['__getattribute__'] is getattribute
+    assert '__setattr__' not in MyObj.__dict__
+    assert '__delattr__' not in MyObj.__dict__
+
+    # Once for the calculation, and once to check the memo.
+    assert calls == ['y', 'y']
+
+    obj.y = 2
+    assert obj.x == 2
+
+def test_tracked_mutators():
+
+    @autoprop.cache(policy='tracked', provide_mutators=True)
+    class MyObj:
+
+        def __init__(self):
+            self.y = 1
+
+        def get_x(self):
+            return self.y
+
+    obj = MyObj()
+    assert obj.x == 1
+
+    obj.x = 2
+    obj.y = 3
+    assert obj.x == 2
+
+    del obj.x
+    assert obj.x == 3
+
+def test_tracked_storage_err():
+    with pytest.raises(ValueError, match="tracked properties"):
+        make_tracked_class(autoprop.cache(
+            policy='tracked',
+            storage=TableStorage(),
+        ))
+
+def test_tracked_async_err():
+    with pytest.raises(ValueError, match="async getter"):
+
+        @autoprop.cache(policy='tracked')
+        class MyObj:
+
+            async def get_x(self):
+                return 1
+
+SINGLE_FLIGHT_POLICIES = [
+        autoprop.cache(policy='manual', single_flight=True),
+        autoprop.cache(policy='automatic', watch=['y'], single_flight=True),
+        autoprop.cache(policy='immutable', single_flight=True),
+]
+
+@pytest.mark.parametrize('decorator', SINGLE_FLIGHT_POLICIES)
+@pytest.mark.parametrize('slots', [False, True])
+def test_single_flight(decorator, slots):
+    calls = []
+    results = []
+
+    @decorator
+    class MyObj:
+        if slots:
+            __slots__ = ()
+
+        y = 1
+
+        def get_x(self):
+            calls.append(self)
+            time.sleep(0.01)
+            return object()
+
+    obj = MyObj()
+    run_threads(lambda: results.append(obj.x), 4)
+
+    assert calls == [obj]
+    assert len(results) == 4
+    assert all(x is obj.x for x in results)
+
+def test_single_flight_err():
+    calls = []
+    errors = []
+
+    @autoprop.cache(policy='manual', single_flight=True)
+    class MyObj:
+        def get_x(self):
+            calls.append(self)
+            time.sleep(0.01)
+            if len(calls) == 1:
+                raise ValueError(len(calls))
+            return len(calls)
+
+    def access():
+        try:
+            obj.x
+        except ValueError as err:
+            errors.append(err)
+
+    obj = MyObj()
+    run_threads(access, 4)
+
+    assert calls == [obj]
+    assert len(errors) == 4
+    assert all(err is errors[0] for err in errors)
+
+    # The failed computation isn't remembered.
+    assert obj.x == 2
+    assert calls == [obj, obj]
+
+def test_single_flight_separate_instances():
+    # Different instances must still be able to compute their values at the
+    # same time.  This would time out if the computations were serialized.
+    barrier = threading.Barrier(2, timeout=5)
+    results = []
+
+    @autoprop.cache(policy='manual', single_flight=True)
+    class MyObj:
+        def get_x(self):
+            barrier.wait()
+            return object()
+
+    objs = [MyObj(), MyObj()]
+    run_threads(lambda: results.append(objs.pop().x), 2)
+
+    assert len(results) == 2
+    assert not barrier.broken
+
+def test_single_flight_inherit():
+    @autoprop.cache(policy='manual', single_flight=True)
+    class MyObj:
+
+        @autoprop.cache(policy='manual', provide_mutators=True)
+        def get_x(self):
+            return self.y
+
+        @autoprop.cache(policy='manual', single_flight=False)
+        def get_y(self):
+            return 1
+
+    assert MyObj.x.fget is not MyObj.get_x.__wrapped__
+    assert MyObj.y.fget is MyObj.get_y.__wrapped__
+    assert MyObj().x == 1
+
+def test_single_flight_recursive():
+    # A getter that accesses its own property shouldn't wait for itself.
+    @autoprop.cache(policy='manual', single_flight=True)
+    class MyObj:
+        def __init__(self):
+            self.depth = 0
+
+        def get_x(self):
+            self.depth += 1
+            return self.x if self.depth < 3 else self.depth
+
+    assert MyObj().x == 3
+
+def run_async(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+ASYNC_DECORATORS = {
+        'overwrite': autoprop.cache,
+        'manual': autoprop.cache(policy='manual'),
+        'manual, single flight': autoprop.cache(policy='manual', single_flight=True),
+        'automatic': autoprop.cache(policy='automatic', watch=['y']),
+        'immutable': autoprop.immutable,
+        'slots': autoprop.cache(policy='automatic', watch=['y'], slots=True),
+        'weak': autoprop.cache(policy='manual', storage='weak'),
+}
+
+def make_async_class(decorator, result=lambda obj: obj.y):
+
+    @decorator
+    class MyObj:
+
+        def __init__(self):
+            self.y = [1]
+            self.calls = 0
+
+        async def get_x(self):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            return result(self)
+
+    return MyObj
+
+@pytest.mark.parametrize('decorator', ASYNC_DECORATORS.values(), ids=list(ASYNC_DECORATORS))
+def test_async(decorator):
+    MyObj = make_async_class(decorator)
+    obj = MyObj()
+
+    async def main():
+        results = await asyncio.gather(*[obj.x for _ in range(4)], obj.get_x())
+        results += [await obj.x, await obj.get_x()]
+        return results
+
+    results = run_async(main())
+
+    assert obj.calls == 1
+    assert all(x is obj.y for x in results)
+    assert isinstance(obj.x, autoprop.CachedAwaitable)
+
+@pytest.mark.parametrize('decorator', ['overwrite', 'manual', 'slots', 'weak'])
+def test_async_err(decorator):
+    def result(obj):
+        if obj.calls == 1:
+            raise ValueError(obj.calls)
+        return obj.calls
+
+    MyObj = make_async_class(ASYNC_DECORATORS[decorator], result)
+    obj = MyObj()
+
+    async def main():
+        return await asyncio.gather(
+                *[obj.x for _ in range(4)],
+                return_exceptions=True,
+        )
+
+    errors = run_async(main())
+
+    assert obj.calls == 1
+    assert all(isinstance(err, ValueError) for err in errors)
+
+    # The failure isn't cached.
+    assert run_async(main()) == [2, 2, 2, 2]
+    assert obj.calls == 2
+
+def test_async_cancel():
+    MyObj = make_async_class(autoprop.cache(policy='manual'))
+    obj = MyObj()
+
+    async def main():
+        waiter = asyncio.ensure_future(obj.x)
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await obj.x
+
+    assert run_async(main()) is obj.y
+    assert obj.calls == 1
+
+def test_async_mutators():
+    MyObj = make_async_class(autoprop.cache(policy='automatic', watch=['y'], provide_mutators=True))
+    obj = MyObj()
+
+    async def get_x():
+        return await obj.x
+
+    assert run_async(get_x()) == [1]
+
+    obj.y = [2]
+    assert run_async(get_x()) == [2]
+    assert obj.calls == 2
+
+    obj.x = 3
+    assert run_async(get_x()) == 3
+    autoprop.set_cached_attr(obj, 'x', 4)
+    assert run_async(get_x()) == 4
+    assert obj.calls == 2
+
+    del obj.x
+    assert run_async(get_x()) == [2]
+    assert obj.calls == 3
+
+def test_async_subclass():
+    # A subclass that replaces an async getter with a regular one should cache
+    # plain values again.
+    Parent = make_async_class(autoprop.cache(policy='manual'))
+
+    @autoprop.cache(policy='manual')
+    class Child(Parent):
+        def get_x(self):
+            return 'child'
+
+    child = Child()
+    assert child.x == 'child'
+
+    autoprop.set_cached_attr(child, 'x', 'set')
+    assert child.x == 'set'
+
+FUTURE_DECORATORS = {
+        'default': autoprop.cache(policy='future'),
+        'executor': autoprop.cache(policy='future', executor=ThreadPoolExecutor(2)),
+        'slots': autoprop.cache(policy='future', slots=True),
+        'weak': autoprop.cache(policy='future', storage='weak'),
+}
+
+def make_future_class(decorator, getter=lambda obj: obj.y):
+
+    @decorator
+    class MyObj:
+
+        def __init__(self):
+            self.y = [1]
+            self.calls = 0
+
+        def get_x(self):
+            self.calls += 1
+            return getter(self)
+
+    return MyObj
+
+@pytest.mark.parametrize('decorator', FUTURE_DECORATORS.values(), ids=list(FUTURE_DECORATORS))
+def test_future(decorator):
+    MyObj = make_future_class(decorator)
+    obj = MyObj()
+
+    assert isinstance(obj.x, Future)
+    assert obj.x is obj.x is obj.get_x()
+    assert obj.x.result() is obj.y
+    assert obj.calls == 1
+
+def test_future_err():
+    def getter(obj):
+        raise ValueError(obj.calls)
+
+    MyObj = make_future_class(autoprop.cache(policy='future'), getter)
+    obj = MyObj()
+
+    with pytest.raises(ValueError):
+        obj.x.result()
+
+    # Failures are cached, like any other future.
+    with pytest.raises(ValueError):
+        obj.x.result()
+
+    assert obj.calls == 1
+
+def test_future_threads(fast_switching):
+    started = threading.Event()
+    release = threading.Event()
+
+    def getter(obj):
+        started.set()
+        release.wait()
+        return obj.y
+
+    MyObj = make_future_class(autoprop.cache(policy='future'), getter)
+    obj = MyObj()
+    futures = []
+
+    def access():
+        futures.append(obj.x)
+
+    threads = [threading.Thread(target=access) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    started.wait()
+    release.set()
+
+    assert all(f is futures[0] for f in futures)
+    assert futures[0].result() is obj.y
+    assert obj.calls == 1
+
+def test_future_mutators():
+    MyObj = make_future_class(
+            autoprop.cache(policy='future', provide_mutators=True),
+    )
+    obj = MyObj()
+
+    assert obj.x.result() == [1]
+
+    obj.x = 2
+    assert obj.x.result() == 2
+
+    future = Future()
+    obj.x = future
+    assert obj.x is future
+
+    del obj.x
+    assert future.cancelled()
+    assert obj.x.result() == [1]
+    assert obj.calls == 2
+
+@pytest.mark.parametrize('storage', ['dict', 'slots', 'weak'])
+def test_future_clear_cache(storage):
+    started = threading.Event()
+    release = threading.Event()
+
+    def getter(obj):
+        started.set()
+        release.wait()
+        return obj.calls
+
+    executor = ThreadPoolExecutor(1)
+    MyObj = make_future_class(
+            autoprop.cache(policy='future', executor=executor, storage=storage),
+            getter,
+    )
+    obj_1 = MyObj()
+    obj_2 = MyObj()
+
+    # The first future occupies the only thread, so the second can't start 
+    # until it's released.
+    running = obj_1.x
+    started.wait()
+    pending = obj_2.x
+
+    autoprop.clear_cache(obj_1)
+    autoprop.clear_cache(obj_2)
+
+    assert pending.cancelled()
+    assert not running.cancelled()
+
+    release.set()
+    assert running.result() == 1
+
+    # The futures are recomputed after being cleared.
+    assert obj_1.x is not running
+    assert obj_1.x.result() == 2
+    assert obj_2.x.result() == 1
+
+def test_future_inherit_executor():
+    executor = ThreadPoolExecutor(1, thread_name_prefix='test_inherit')
+
+    @autoprop.cache(policy='future', executor=executor)
+    class MyObj:
+
+        def get_x(self):
+            return threading.current_thread().name
+
+        @autoprop.cache(policy='future')
+        def get_y(self):
+            return threading.current_thread().name
+
+    obj = MyObj()
+    assert obj.x.result().startswith('test_inherit')
+    assert obj.y.result().startswith('test_inherit')
+
+def test_future_async_err():
+    with pytest.raises(ValueError, match="async getter"):
+
+        @autoprop.cache(policy='future')
+        class MyObj:
+            async def get_x(self):
+                pass
+
+INVALIDATES_DECORATORS = {
+        'manual': autoprop.cache(policy='manual'),
+        'slots': autoprop.cache(policy='manual', slots=True),
+        'weak': autoprop.cache(policy='manual', storage='weak'),
+        'immutable': autoprop.immutable,
+        'overwrite': autoprop.cache,
+}
+
+def make_invalidates_class(decorator):
+
+    @decorator
+    class MyObj:
+        __slots__ = '_w', '_h', 'calls', '__dict__', '__weakref__'
+
+        def __init__(self):
+            self._w = 1
+            self._h = 2
+            self.calls = []
+
+        @autoprop.dynamic
+        def get_w(self):
+            return self._w
+
+        @autoprop.invalidates('area', 'perimeter')
+        def set_w(self, w):
+            self._w = w
+
+        @autoprop.invalidates('area')
+        def del_w(self):
+            self._w = 0
+
+        def get_area(self):
+            self.calls.append('area')
+            return self._w * self._h
+
+        def get_perimeter(self):
+            self.calls.append('perimeter')
+            return 2 * (self._w + self._h)
+
+    return MyObj
+
+@pytest.mark.parametrize('decorator', INVALIDATES_DECORATORS.values(), ids=list(INVALIDATES_DECORATORS))
+def test_invalidates(decorator):
+    MyObj = make_invalidates_class(decorator)
+    obj = MyObj()
+
+    # Values that aren't cached yet don't need to be dropped.
+    obj.w = 2
+    assert obj.calls == []
+
+    assert (obj.area, obj.perimeter) == (4, 8)
+    assert (obj.area, obj.perimeter) == (4, 8)
+    assert obj.calls == ['area', 'perimeter']
+
+    obj.w = 3
+    assert (obj.area, obj.perimeter) == (6, 10)
+    assert obj.calls == ['area', 'perimeter', 'area', 'perimeter']
+
+    # Calling the mutator directly has the same effect.
+    obj.calls = []
+    obj.set_w(4)
+    assert (obj.area, obj.perimeter) == (8, 12)
+    assert obj.calls == ['area', 'perimeter']
+
+    obj.calls = []
+    del obj.w
+    assert (obj.area, obj.perimeter) == (0, 12)
+    assert obj.calls == ['area']
+
+def test_invalidates_default_mutators():
+
+    @autoprop.cache(policy='manual', provide_mutators=True)
+    class MyObj:
+
+        def __init__(self):
+            self.calls = []
+
+        @autoprop.invalidates('area')
+        def get_w(self):
+            return 1
+
+        def get_area(self):
+            self.calls.append('area')
+            return 2 * self.w
+
+    obj = MyObj()
+    assert obj.area == obj.area == 2
+
+    obj.w = 2
+    assert obj.area == obj.area == 4
+
+    del obj.w
+    assert obj.area == obj.area == 2
+    assert obj.calls == ['area', 'area', 'area']
+
+def test_invalidates_versioned():
+    # Invalidated values are also dropped from any versioned properties that 
+    # depend on them.
+
+    @autoprop.cache(policy='manual')
+    class MyObj:
+
+        def __init__(self):
+            self._w = 1
+
+        @autoprop.invalidates('area')
+        def set_w(self, w):
+            self._w = w
+
+        def get_area(self):
+            return 2 * self._w
+
+        @autoprop.cache(policy='automatic', watch=['area'], versioned=True)
+        def get_volume(self):
+            return 3 * self.area
+
+    obj = MyObj()
+    assert obj.volume == 6
+
+    obj.w = 2
+    assert obj.volume == 12
+
+def test_invalidates_inherit():
+    MyObj = make_invalidates_class(autoprop.cache(policy='manual'))
+
+    @autoprop.cache(policy='manual')
+    class Inherit(MyObj):
+        pass
+
+    obj = Inherit()
+    assert obj.area == 2
+
+    obj.set_w(2)
+    assert obj.area == 4
+
+    # Overriding the setter also overrides its `@invalidates` decorator.
+    @autoprop.cache(policy='manual')
+    class Override(MyObj):
+
+        def set_w(self, w):
+            self._w = w
+
+    obj = Override()
+    assert obj.area == 2
+
+    obj.w = 2
+    assert obj.area == 2
+
+    # Redecorating the class starts over with the original mutators.
+    autoprop.cache(policy='manual')(MyObj)
+    obj = MyObj()
+    assert obj.area == 2
+
+    obj.w = 2
+    assert obj.area == 4
+    assert MyObj.set_w.__wrapped__.__name__ == 'set_w'
+    assert not hasattr(MyObj.set_w.__wrapped__, '__wrapped__')
+
+def test_invalidates_signature():
+    # Calling the mutator directly passes on every argument, and returns 
+    # whatever the mutator returns.
+
+    @autoprop.cache(policy='manual')
+    class MyObj:
+
+        def __init__(self):
+            self._w = 1
+            self.log = []
+
+        @autoprop.invalidates('area')
+        def set_w(self, w, *, log=False):
+            if log:
+                self.log.append(w)
+            self._w = w
+            return self
+
+        @autoprop.invalidates('area')
+        def del_w(self):
+            self._w = 0
+            return 'deleted'
+
+        def get_area(self):
+            return 2 * self._w
+
+    obj = MyObj()
+    assert obj.area == 2
+
+    assert obj.set_w(3, log=True) is obj
+    assert obj.log == [3]
+    assert obj.area == 6
+
+    assert obj.set_w(w=4).area == 8
+    assert obj.log == [3]
+
+    assert obj.del_w() == 'deleted'
+    assert obj.area == 0
+
+def test_invalidates_not_accessor_err():
+    with pytest.raises(ValueError, match=r"MyObj\.update; it's not an accessor"):
+
+        class MyObj:
+
+            @autoprop.invalidates('x')
+            def update(self):
+                pass
+
+def test_invalidates_not_cached_err():
+    with pytest.raises(ValueError, match=r"can't invalidate 'y' when .*MyObj\.x is changed; it's not a cached property"):
+
+        @autoprop
+        class MyObj:
+
+            def get_x(self):
+                return 1
+
+            @autoprop.invalidates('y')
+            def set_x(self, x):
+                pass
+
+            def get_y(self):
+                return 1
+
+FROZEN_POLICIES = [
+        autoprop.cache,
+        autoprop.cache(policy='manual'),
+        autoprop.cache(policy='manual', provide_mutators=True),
+        autoprop.cache(policy='automatic', watch=['x']),
+        autoprop.immutable,
+]
+
+def make_frozen_classes():
+    frozen = {}
+
+    if sys.version_info >= (3, 7):
+        from dataclasses import dataclass
+        frozen['dataclass(frozen=True)'] = dataclass(frozen=True), True
+
+    if sys.version_info >= (3, 10):
+        frozen['dataclass(frozen=True, slots=True)'] = \
+                dataclass(frozen=True, slots=True), False
+
+    try:
+        import attr
+    except ImportError:
+        pass
+    else:
+        frozen['attr.s(frozen=True)'] = \
+                attr.s(frozen=True, auto_attribs=True), True
+        frozen['attr.s(frozen=True, slots=True)'] = \
+                attr.s(frozen=True, slots=True, auto_attribs=True), False
+
+    return frozen
+
+FROZEN_CLASSES = make_frozen_classes()
+
+@pytest.mark.parametrize('decorator', FROZEN_POLICIES)
+@pytest.mark.parametrize('frozen', FROZEN_CLASSES)
+@pytest.mark.parametrize('autoprop_first', [False, True])
+def test_frozen(decorator, frozen, autoprop_first):
+    frozen, has_dict = FROZEN_CLASSES[frozen]
+
+    def decorate(cls):
+        if autoprop_first:
+            return frozen(decorator(cls))
+        else:
+            return decorator(frozen(cls))
+
+    @decorate
+    class Point:
+        x: list
+
+        def get_y(self):
+            return ['y', self.x]
+
+    p = Point([1])
+
+    if autoprop_first and not has_dict:
+        # The frozen decorator rebuilds the class to add slots, after 
+        # autoprop has already decided where to store the cache.
+        with pytest.raises(TypeError):
+            p.y
+        return
+
+    assert p.y is p.y
+    assert p.y == p.get_y() == ['y', [1]]
+
+    with pytest.raises(AttributeError):
+        p.x = [2]
+
+    # The `overwrite` policy only clears values stored in slots.
+    if decorator is not autoprop.cache or not has_dict:
+        y = p.y
+        autoprop.clear_cache(p)
+        assert p.y == y
+        assert p.y is not y
+
+    assert p == Point([1])
+
 @pytest.mark.parametrize(
         'getter_decorator', [
             autoprop.cache,
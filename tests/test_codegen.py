@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+
+import pytest
+import autoprop
+import asyncio
+
+from autoprop.codegen import generate, verify, main
+from concurrent.futures import ThreadPoolExecutor
+from textwrap import dedent
+
+PARENT = '''\
+@DECORATE
+class Parent:
+
+    def __init__(self, x):
+        self._x = x
+
+    def get_inherited(self):
+        return ['inherited', self._x]
+
+    def set_inherited(self, value):
+        self._x = value
+'''
+
+CHILD = '''\
+@DECORATE
+class Child(Parent):
+
+    def get_x(self):
+        return ['x', self._x]
+
+    def set_x(self, x):
+        self._x = x
+
+    def get_args(self, i=0):
+        return ['args', self._x, i]
+
+    @autoprop.dynamic
+    def get_dynamic(self):
+        return ['dynamic', self._x]
+
+    def get_inherited(self):
+        return ['child', self._x]
+
+    def _get_protected(self):
+        return ['protected', self._x]
+
+    def __get_private(self):
+        return ['private', self._x]
+
+    def get_private(self):
+        return self.__private
+'''
+
+DECORATORS = [
+        'autoprop',
+        "autoprop.cache(policy='manual')",
+        "autoprop.cache(policy='manual', provide_mutators=True)",
+        "autoprop.cache(policy='automatic', watch=['_x'])",
+        "autoprop.cache(policy='automatic', watch='infer')",
+        "autoprop.cache(policy='manual', single_flight=True)",
+]
+
+def make_classes(decorator, child_src=CHILD, parent_decorator=None):
+    scope = {'autoprop': autoprop, '__name__': 'codegen_test'}
+    exec(PARENT.replace('DECORATE', parent_decorator or decorator), scope)
+    exec(child_src.replace('DECORATE', decorator), scope)
+    return scope['Parent'], scope['Child']
+
+def make_generated_class(decorator, parent_decorator=None):
+    _, decorated = make_classes(decorator, parent_decorator=parent_decorator)
+    code = generate(decorated)
+
+    # Remove the decorator, and append the generated code to the class body.
+    child_src = CHILD.replace('@DECORATE\n', '') + code
+    parent, generated = make_classes(
+            decorator,
+            child_src=child_src,
+            parent_decorator=parent_decorator,
+    )
+    return decorated, generated, code
+
+def describe_behavior(cls):
+    obj = cls(1)
+    results = {}
+
+    for attr in ['x', 'args', 'dynamic', 'inherited', '_protected', 'private']:
+        results[attr] = getattr(obj, attr)
+
+    obj._x = 2
+    results['get_x()'] = obj.get_x()
+    results['get_args(1)'] = obj.get_args(1)
+
+    for attr in ['x', 'args', 'dynamic', 'inherited']:
+        results[attr + ' after update'] = getattr(obj, attr)
+
+    try:
+        obj.x = 3
+    except AttributeError:
+        results['set x'] = AttributeError
+    else:
+        results['set x'] = obj.x
+
+    autoprop.clear_cache(obj)
+    results['x after clear'] = obj.x
+
+    return results
+
+@pytest.mark.parametrize('decorator', DECORATORS)
+@pytest.mark.parametrize('parent_decorator', [None, "autoprop.cache(policy='manual')"])
+def test_generate(decorator, parent_decorator):
+    decorated, generated, code = make_generated_class(decorator, parent_decorator)
+
+    assert 'get_x' in code
+    assert verify(generated) == []
+    assert describe_behavior(generated) == describe_behavior(decorated)
+    assert vars(generated).keys() - vars(decorated).keys() == {
+            '__autoprop_codegen__',
+    }
+
+def test_generate_overwrite():
+    @autoprop.cache
+    class Example:
+        def __init__(self): #
+            self.n = 0
+        def get_x(self): #
+            self.n += 1
+            return self.n
+
+    code = generate(Example)
+    assert "x = _autoprop.OverwriteCachedProperty(get_x)" in code
+
+    scope = {}
+    exec(dedent('''\
+        class Example:
+            def __init__(self):
+                self.n = 0
+            def get_x(self):
+                self.n += 1
+                return self.n
+    ''') + code, scope)
+    Generated = scope['Example']
+
+    assert verify(Generated) == []
+
+    e = Generated()
+    assert e.x == e.x == e.get_x() == 1
+
+def test_generate_invalidates():
+    src = dedent('''\
+        class Example:
+            def __init__(self):
+                self._w = 1
+            def get_w(self):
+                return self._w
+            @autoprop.invalidates('area')
+            def set_w(self, w):
+                self._w = w
+            @autoprop.invalidates('area')
+            def get_h(self):
+                return 2
+            def get_area(self):
+                return self._w * self.h
+    ''')
+    scope = {'autoprop': autoprop}
+    exec(src, scope)
+    Example = autoprop.cache(policy='manual', provide_mutators=True)(scope['Example'])
+
+    code = generate(Example)
+    assert "set_w = _autoprop.invalidating(set_w, ('area',))" in code
+
+    scope = {'autoprop': autoprop}
+    exec(src + code, scope)
+    Generated = scope['Example']
+
+    assert verify(Generated) == []
+
+    e = Generated()
+    assert e.area == 2
+
+    e.w = 2
+    assert e.area == 4
+
+    e.h = 3
+    assert e.area == 6
+
+def test_generate_async():
+    @autoprop.cache(policy='manual', single_flight=True)
+    class Example:
+        async def get_x(self):
+            return 1
+
+    code = generate(Example)
+    assert "_autoprop.async_getter(get_x, 'x')" in code
+
+    scope = {}
+    exec(dedent('''\
+        class Example:
+            async def get_x(self):
+                return 1
+    ''') + code, scope)
+    Generated = scope['Example']
+
+    assert verify(Generated) == []
+
+    async def main():
+        e = Generated()
+        return await e.x, await e.x, await e.get_x()
+
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(main()) == (1, 1, 1)
+    finally:
+        loop.close()
+
+def test_generate_future():
+    @autoprop.cache(policy='future')
+    class Example:
+        def get_x(self):
+            return 1
+
+    code = generate(Example)
+    assert "_autoprop.future_getter(get_x, 'x')" in code
+
+    scope = {}
+    exec(dedent('''\
+        class Example:
+            def get_x(self):
+                return 1
+    ''') + code, scope)
+    Generated = scope['Example']
+
+    assert verify(Generated) == []
+
+    e = Generated()
+    assert e.x is e.get_x()
+    assert e.x.result() == 1
+
+def test_generate_future_executor_err():
+    executor = ThreadPoolExecutor(1)
+
+    @autoprop.cache(policy='future', executor=executor)
+    class Example:
+        def get_x(self):
+            return 1
+
+    with pytest.raises(ValueError, match="can't generate code for executor"):
+        generate(Example)
+
+    @autoprop
+    class Example:
+        @autoprop.cache(policy='future', executor=executor)
+        def get_x(self):
+            return 1
+
+    with pytest.raises(ValueError, match="can't generate code for executor"):
+        generate(Example)
+
+def test_generate_subclass():
+    # Subclasses of generated classes should behave just like subclasses of
+    # decorated classes.
+
+    _, generated, _ = make_generated_class("autoprop.cache(policy='manual')")
+
+    @autoprop
+    class Grandchild(generated):
+        def set_x(self, x):
+            self._x = -x
+
+    g = Grandchild(1)
+    assert g.x == ['x', 1]
+    g.x = 2
+    assert g.x == ['x', -2]
+    assert g.get_x() == ['x', -2]
+
+@pytest.mark.parametrize('args', ['', ', i=0'])
+def test_generate_inherited_getter(args):
+    # The getter wrapper has to refer to getters defined by the parent class.
+    parent_src = f'''\
+class Parent:
+
+    def __init__(self, x):
+        self._x = x
+
+    def get_y(self{args}):
+        return ['y', self._x]
+'''
+    child_src = '''\
+@DECORATE
+class Child(Parent):
+
+    def set_y(self, y):
+        self._x = y
+'''
+
+    def make_child(src):
+        scope = {'autoprop': autoprop, '__name__': 'codegen_test'}
+        exec(parent_src, scope)
+        exec(src, scope)
+        return scope['Child']
+
+    decorated = make_child(child_src.replace(
+        'DECORATE', "autoprop.cache(policy='manual')",
+    ))
+    code = generate(decorated)
+    assert 'Parent.get_y' in code
+
+    generated = make_child(child_src.replace('@DECORATE\n', '') + code)
+    assert verify(generated) == []
+
+    obj = generated(1)
+    assert obj.y == obj.get_y() == ['y', 1]
+    obj._x = 2
+    assert obj.y == obj.get_y() == ['y', 1]
+
+def test_generate_undecorated_err():
+    class Example:
+        def get_x(self):
+            pass
+
+    with pytest.raises(ValueError, match='not decorated'):
+        generate(Example)
+
+def test_generate_storage_err():
+    @autoprop.cache(policy='manual', storage='weak')
+    class Example:
+        def get_x(self):
+            pass
+
+    with pytest.raises(ValueError, match='WeakStorage'):
+        generate(Example)
+
+def test_generate_watch_callable_err():
+    @autoprop.cache(policy='automatic', watch=[lambda self: self._x])
+    class Example:
+        def get_x(self):
+            pass
+
+    with pytest.raises(ValueError, match='watched callable'):
+        generate(Example)
+
+@pytest.mark.parametrize(
+        'decorator, slots', [
+            ('autoprop', "'_x',"),
+            ('autoprop', "'_x', '__dict__'"),
+            ("autoprop.cache(policy='manual')", "'_x', '__dict__'"),
+        ],
+)
+def test_verify_slots(decorator, slots):
+    src = f'''\
+class Example:
+    __slots__ = {slots}
+
+    def __init__(self, x):
+        self._x = x
+
+    def get_x(self):
+        return ['x', self._x]
+'''
+    scope = {'autoprop': autoprop, '__name__': 'codegen_test'}
+    exec(f'@{decorator}\n' + src, scope)
+    code = generate(scope['Example'])
+
+    exec(src + code, scope)
+    generated = scope['Example']
+    assert verify(generated) == []
+    assert generated(1).x == ['x', 1]
+
+def test_verify_stale():
+    _, decorated = make_classes("autoprop.cache(policy='manual')")
+    code = generate(decorated)
+
+    # Add an accessor, and change the policy of another, after generating the
+    # code.
+    child_src = CHILD.replace('@DECORATE\n', '') + code + (
+            "    def get_new(self):\n"
+            "        return 'new'\n"
+            "    x = property(get_x.__wrapped__)\n"
+    )
+
+    _, stale = make_classes("autoprop.cache(policy='manual')", child_src=child_src)
+    problems = verify(stale)
+
+    assert "new: missing from generated code" in problems
+    assert any(p.startswith("x: expected ('CachedProperty'") for p in problems)
+
+def test_verify_no_generated_code():
+    class Example:
+        pass
+
+    assert verify(Example) == ["test_verify_no_generated_code.<locals>.Example doesn't contain any generated code"]
+
+def test_main(tmp_path, monkeypatch, capsys):
+    (tmp_path / 'codegen_main.py').write_text(dedent('''\
+        import autoprop
+
+        @autoprop.cache
+        class Example:
+            def get_x(self):
+                return 1
+    '''))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert main(['codegen_main:Example']) == 0
+    code = capsys.readouterr().out
+    assert code.startswith('    # Generated by `python -m autoprop.codegen codegen_main:Example`')
+
+    (tmp_path / 'codegen_main_generated.py').write_text(dedent('''\
+        import autoprop
+
+        class Example:
+            def get_x(self):
+                return 1
+    ''') + code)
+
+    assert main(['codegen_main_generated:Example', '--verify']) == 0
+    assert capsys.readouterr().out == ''
+
+    assert main(['codegen_main:Example', '--verify']) == 1
+    assert "doesn't contain any generated code" in capsys.readouterr().out
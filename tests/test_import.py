@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import pytest
+import autoprop
+import os
+import subprocess
+import sys
+
+from autoprop.bench.decoration import measure_autoprop_import
+from pathlib import Path
+
+# The budget is generous, because it has to accommodate slow CI machines.  On 
+# a typical desktop, importing autoprop takes a few milliseconds.
+IMPORT_BUDGET_MS = 50
+
+@pytest.mark.parametrize(
+    'module', [
+        'inspect', 're', 'typing', 'signature_dispatch', 'dis',
+        'concurrent.futures', 'asyncio', 'autoprop.codegen',
+    ],
+)
+def test_import_modules(module):
+    # Check in a new interpreter, because pytest itself imports all of these 
+    # modules.
+    p = subprocess.run(
+            [
+                sys.executable, '-c',
+                f'import sys, autoprop; print({module!r} in sys.modules)',
+            ],
+            cwd=Path(autoprop.__file__).parent.parent,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+    )
+    assert p.stdout.strip() == 'False'
+
+# Wall-clock budgets are too noisy for shared CI machines, so this is only 
+# checked on request.  The slow modules that autoprop avoids importing are 
+# checked above instead, and the decoration benchmark also measures import 
+# time, relative to a baseline.
+@pytest.mark.skipif(
+        not os.environ.get('AUTOPROP_CHECK_IMPORT_TIME'),
+        reason="set AUTOPROP_CHECK_IMPORT_TIME=1 to check the import time budget",
+)
+def test_import_time():
+    t = measure_autoprop_import(repeat=3)
+    assert t * 1e3 < IMPORT_BUDGET_MS